@@ -1,24 +1,69 @@
-from flask import Flask, render_template, jsonify, Response, request
-from flask_socketio import SocketIO, emit
+import os
+
+# Async server backend: threading by default, set WINDTUNNEL_ASYNC_MODE=eventlet to opt in.
+# Threads keep sqlite queries, exports and I2C/GPIO reads (which release the
+# GIL) from stalling the sampling loop; under eventlet they block the one hub.
+# eventlet has to patch the standard library before anything else imports it.
+ASYNC_MODE = os.environ.get('WINDTUNNEL_ASYNC_MODE', 'threading')
+if ASYNC_MODE == 'eventlet':
+    try:
+        import eventlet
+        eventlet.monkey_patch()
+    except ImportError:
+        ASYNC_MODE = 'threading'
+
+from flask import Flask, render_template, jsonify, Response, request, send_file
+from flask.json.provider import DefaultJSONProvider
+from flask_socketio import SocketIO, emit, join_room
 import random
+import ast
 import time
 import json
-import os
 import re
 import csv
-import sys
 import sqlite3
+import struct
+import hashlib
+import queue
 import socket
 import logging
+import logging.handlers
 import math
 import threading
-from datetime import datetime
+import sched
+import atexit
+import copy
+import shutil
+import subprocess
+import traceback
+from datetime import datetime, timedelta, timezone
 from threading import Lock, Thread
+from collections import deque
+from contextlib import contextmanager
+from urllib.parse import quote
 
-# Configure logging
+try:
+    import orjson  # Optional fast JSON encoder/decoder
+except ImportError:
+    orjson = None
+
+try:
+    import pygit2  # Optional - in-process git repository access (libgit2)
+except ImportError:
+    pygit2 = None
+
+# Configure logging - records are handed to a queue and written to stderr by
+# a listener thread, so a slow console never blocks the sampling loop
+log_queue = queue.Queue(-1)
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter('%(levelname)s [%(name)s] %(message)s'))
+log_listener = logging.handlers.QueueListener(log_queue, log_stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
 logging.basicConfig(
     level=logging.INFO,
-    format='%(levelname)s [%(name)s] %(message)s'
+    format='%(message)s',  # Level and logger name are added by log_stream_handler
+    handlers=[logging.handlers.QueueHandler(log_queue)]
 )
 logger = logging.getLogger('windtunnel')
 sensor_logger = logging.getLogger('windtunnel.sensor')
@@ -36,45 +81,101 @@ DB_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sensor_data.
 DATA_RETENTION_HOURS = 24  # Keep last 24 hours of data
 UPDATE_INTERVAL_MS = 200  # Fixed at 200ms (5Hz) for consistency
 
-# Data logging directory (for CSV exports) - DISABLED, using database only
-# DATA_LOG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_logs')
-# if not os.path.exists(DATA_LOG_DIR):
-#     os.makedirs(DATA_LOG_DIR)
+# Buffer for batch writes - deque append/popleft are thread-safe, so producers
+# and the flusher don't need a lock. Bounded so a failing database can't grow
+# it forever (oldest rows are dropped first).
+DB_WRITE_QUEUE_MAX = 200000
+db_write_queue = deque(maxlen=DB_WRITE_QUEUE_MAX)
+
+# Batch insert statement - kept as one constant string so sqlite3's statement
+# cache reuses the prepared statement across flushes
+SENSOR_INSERT_SQL = (
+    'INSERT OR REPLACE INTO sensor_data (timestamp, sensor_id, value, sequence_name, step_number) '
+    'VALUES (?, ?, ?, ?, ?)'
+)
 
-# Log management configuration - DISABLED
-# MAX_LOG_FILE_SIZE_MB = 50
-# MAX_LOG_FILES = 100
-# MAX_TOTAL_LOG_SIZE_MB = 2000
+# Integer IDs of the sensor names in the sensor_names table {name: id}.
+# Extended by flush_db_write_queue() once new names are committed.
+sensor_name_ids = {}
 
-# Current log file (set when logging starts) - DISABLED
-# current_log_file = None
-# log_session_start = None
-# log_rows_written = 0
+# Pooled connections for API read queries {queue of sqlite3.Connection}
+DB_READ_POOL_SIZE = 4
+db_read_pool = queue.Queue()
 
-# Database connection and lock
-db_lock = Lock()
-db_write_queue = []  # Buffer for batch writes
+def open_db_connection(read_only=False):
+    """Open a connection to DB_FILE with the per-connection PRAGMAs applied.
+    
+    read_only connections are opened with mode=ro, so API reads can never take
+    the write lock away from the flush (WAL lets them run alongside it).
+    """
+    # sqlite3's default 5 s timeout doubles as busy_timeout - waits out a concurrent writer
+    if read_only:
+        uri = f'file:{quote(os.path.abspath(DB_FILE))}?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, timeout=5.0, check_same_thread=False)
+    else:
+        conn = sqlite3.connect(DB_FILE, timeout=5.0, check_same_thread=False)
+    conn.execute('PRAGMA synchronous=NORMAL')  # Safe with WAL, avoids an fsync per commit
+    conn.execute('PRAGMA cache_size=-16384')  # 16 MB page cache per connection
+    conn.execute('PRAGMA mmap_size=268435456')  # Memory-map up to 256 MB for reads
+    conn.execute('PRAGMA temp_store=MEMORY')  # Sorts/GROUP BY temp tables stay off the SD card
+    return conn
+
+@contextmanager
+def db_read_connection():
+    """Borrow a pooled connection for read queries and return it to the pool afterwards."""
+    try:
+        conn = db_read_pool.get_nowait()
+    except queue.Empty:
+        conn = open_db_connection(read_only=True)
+    try:
+        yield conn
+    finally:
+        if db_read_pool.qsize() < DB_READ_POOL_SIZE:
+            db_read_pool.put(conn)
+        else:
+            conn.close()
 
 def init_database():
     """Initialize SQLite database with sensor data table and indexes."""
-    conn = sqlite3.connect(DB_FILE)
+    conn = open_db_connection()
     cursor = conn.cursor()
     
-    # Create table with composite primary key (timestamp, sensor_id)
+    # Incremental auto-vacuum lets cleanup give freed pages back to the file
+    # system a bit at a time. Only takes effect on a new database file (existing
+    # ones are switched over by the VACUUM in clear_logs)
+    cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+    
+    # WAL lets API readers run while the background thread flushes writes
+    # (persistent - stored in the database file)
+    cursor.execute('PRAGMA journal_mode=WAL')
+    
+    # Sensor IDs are stored once here - sensor_data refers to them by a small
+    # integer, which keeps rows and index keys narrow
     cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sensor_names (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        )
+    ''')
+    
+    # Create table with composite primary key (timestamp, sensor_id).
+    # WITHOUT ROWID stores rows in the primary key B-tree itself - no separate
+    # rowid lookup, and appends stay sequential since timestamps only increase.
+    sensor_table_sql = '''
         CREATE TABLE IF NOT EXISTS sensor_data (
             timestamp REAL NOT NULL,
-            sensor_id TEXT NOT NULL,
+            sensor_id INTEGER NOT NULL,  -- sensor_names.id
             value REAL NOT NULL,
             sequence_name TEXT,
             step_number INTEGER,
             PRIMARY KEY (timestamp, sensor_id)
-        )
-    ''')
+        ) WITHOUT ROWID
+    '''
+    cursor.execute(sensor_table_sql)
     
     # Check if sequence columns exist (migration for existing databases)
     cursor.execute("PRAGMA table_info(sensor_data)")
-    columns = [col[1] for col in cursor.fetchall()]
+    columns = {col[1]: col[2].upper() for col in cursor.fetchall()}
     
     if 'sequence_name' not in columns:
         cursor.execute('ALTER TABLE sensor_data ADD COLUMN sequence_name TEXT')
@@ -84,18 +185,42 @@ def init_database():
         cursor.execute('ALTER TABLE sensor_data ADD COLUMN step_number INTEGER')
         print("Added step_number column to sensor_data table")
     
-    # Create indexes for fast time-range queries
-    cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_timestamp 
-        ON sensor_data(timestamp)
-    ''')
+    # Migrate tables created before WITHOUT ROWID or with sensor IDs stored
+    # as text (one-time copy)
+    table_sql = cursor.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'sensor_data'"
+    ).fetchone()[0]
+    if 'WITHOUT ROWID' not in table_sql.upper() or columns['sensor_id'] != 'INTEGER':
+        print("Migrating sensor_data table to WITHOUT ROWID with integer sensor IDs...")
+        cursor.execute('BEGIN')
+        cursor.execute('ALTER TABLE sensor_data RENAME TO sensor_data_old')
+        cursor.execute('INSERT OR IGNORE INTO sensor_names (name) SELECT DISTINCT sensor_id FROM sensor_data_old')
+        cursor.execute(sensor_table_sql)
+        cursor.execute('''
+            INSERT INTO sensor_data (timestamp, sensor_id, value, sequence_name, step_number)
+            SELECT d.timestamp, n.id, d.value, d.sequence_name, d.step_number
+            FROM sensor_data_old d JOIN sensor_names n ON n.name = d.sensor_id
+        ''')
+        cursor.execute('DROP TABLE sensor_data_old')
+        conn.commit()
+        print("Migrated sensor_data table to WITHOUT ROWID with integer sensor IDs")
+    
+    # Primary key already starts with timestamp (used by retention cleanup and export)
+    cursor.execute('DROP INDEX IF EXISTS idx_timestamp')
     
+    # Covering index for per-sensor history - range seek on (sensor_id, timestamp)
+    # and the value is read from the index without touching the table
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_sensor_time 
-        ON sensor_data(sensor_id, timestamp)
+        CREATE INDEX IF NOT EXISTS idx_sensor_time_value 
+        ON sensor_data(sensor_id, timestamp, value)
     ''')
     
+    # Superseded by idx_sensor_time_value (same leading columns)
+    cursor.execute('DROP INDEX IF EXISTS idx_sensor_time')
+    
     conn.commit()
+    sensor_name_ids.clear()
+    sensor_name_ids.update(cursor.execute('SELECT name, id FROM sensor_names'))
     conn.close()
     print(f"Database initialized: {DB_FILE}")
 
@@ -103,6 +228,7 @@ def write_sensor_data_to_db(timestamp, sensor_data):
     """
     Write sensor data to database.
     Adds to write queue for batch processing.
+    sensor_data maps sensor ID -> value and must not contain 'timestamp'.
     Also logs system data (fan power, PID setpoint) - database only, not shown on UI.
     """
     # Get current sequence info if active
@@ -114,51 +240,92 @@ def write_sensor_data_to_db(timestamp, sensor_data):
         if step_number is not None:
             step_number = step_number + 1  # Convert 0-based to 1-based for export
     
-    with db_lock:
-        # Log regular sensor data
-        for sensor_id, value in sensor_data.items():
-            if sensor_id != 'timestamp':  # Skip timestamp field
-                db_write_queue.append((timestamp, sensor_id, value, sequence_name, step_number))
-        
-        # Log system data (hidden from UI, only in database/export)
-        # Fan power (PWM %)
-        if fan_state['running']:
-            fan_power = fan_state.get('speed', 0)
-            db_write_queue.append((timestamp, '_SYSTEM_Fan_Power_%', fan_power, sequence_name, step_number))
-        
-        # PID setpoint (target airspeed)
-        if pid_state.get('enabled', False):
-            target_speed = pid_state.get('target_airspeed', 0)
-            db_write_queue.append((timestamp, '_SYSTEM_PID_Setpoint_m/s', target_speed, sequence_name, step_number))
+    # Log regular sensor data - built in one pass and queued with a single extend
+    # (skips failed formulas, the value column is NOT NULL)
+    db_write_queue.extend([
+        (timestamp, sensor_id, value, sequence_name, step_number)
+        for sensor_id, value in sensor_data.items()
+        if value is not None
+    ])
+    
+    # Log system data (hidden from UI, only in database/export)
+    # Fan power (PWM %)
+    if fan_state['running']:
+        fan_power = fan_state.get('speed', 0)
+        db_write_queue.append((timestamp, '_SYSTEM_Fan_Power_%', fan_power, sequence_name, step_number))
+    
+    # PID setpoint (target airspeed)
+    if pid_state.get('enabled', False):
+        target_speed = pid_state.get('target_airspeed', 0)
+        db_write_queue.append((timestamp, '_SYSTEM_PID_Setpoint_m/s', target_speed, sequence_name, step_number))
+
+# Connection used for flushes and cleanup - both run on the maintenance task only,
+# so one connection stays open with a warm page cache and statement cache
+db_writer_conn = None
+
+def get_db_writer_connection():
+    """Return the persistent writer connection, opening it on first use."""
+    global db_writer_conn
+    if db_writer_conn is None:
+        conn = open_db_connection()
+        # Autocommit mode - the sqlite3 module issues no implicit BEGIN, batch
+        # flushes open their transaction explicitly with BEGIN IMMEDIATE
+        conn.isolation_level = None
+        db_writer_conn = conn
+    return db_writer_conn
+
+def close_db_writer_connection():
+    """Close the writer connection - the next flush opens a fresh one."""
+    global db_writer_conn
+    conn, db_writer_conn = db_writer_conn, None
+    if conn is not None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+atexit.register(close_db_writer_connection)
 
 def flush_db_write_queue():
     """
     Flush queued writes to database in a single transaction.
     Called periodically from background thread.
     """
-    global db_write_queue
-    
-    with db_lock:
-        if not db_write_queue:
-            return
-        
-        queue_copy = db_write_queue[:]
-        db_write_queue = []
+    # Drain only what is queued now - rows appended meanwhile wait for the next flush
+    rows = []
+    for _ in range(len(db_write_queue)):
+        rows.append(db_write_queue.popleft())
+    if not rows:
+        return
     
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.executemany(
-            'INSERT OR REPLACE INTO sensor_data (timestamp, sensor_id, value, sequence_name, step_number) VALUES (?, ?, ?, ?, ?)',
-            queue_copy
-        )
-        conn.commit()
-        conn.close()
+        conn = get_db_writer_connection()
+        # Commits on success, rolls back (releasing the write lock) on error.
+        # BEGIN IMMEDIATE takes the write lock up front, so the whole batch is
+        # one transaction with one WAL sync and never fails halfway on a lock upgrade
+        new_names = {row[1] for row in rows}.difference(sensor_name_ids)
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            name_ids = sensor_name_ids
+            if new_names:
+                conn.executemany('INSERT OR IGNORE INTO sensor_names (name) VALUES (?)', [(name,) for name in new_names])
+                name_ids = dict(conn.execute('SELECT name, id FROM sensor_names'))
+            conn.executemany(SENSOR_INSERT_SQL, [
+                (timestamp, name_ids[sensor_id], value, sequence_name, step_number)
+                for timestamp, sensor_id, value, sequence_name, step_number in rows
+            ])
+        if new_names:
+            # Only after the commit - a rolled back insert may hand out its IDs again
+            sensor_name_ids.update(name_ids)
     except Exception as e:
-        print(f"Error writing to database: {e}")
-        # Re-queue failed writes
-        with db_lock:
-            db_write_queue.extend(queue_copy)
+        logger.error(f"Error writing to database: {e}")
+        # Re-queue failed writes ahead of newer rows
+        db_write_queue.extendleft(reversed(rows))
+        # Start over with a fresh connection in case this one is broken
+        close_db_writer_connection()
+
+CLEANUP_BATCH_ROWS = 10000  # Rows deleted per transaction by cleanup_old_data()
+CLEANUP_VACUUM_PAGES = 1000  # Free pages returned to the file system per cleanup (incremental auto-vacuum)
 
 def cleanup_old_data():
     """Remove sensor data older than configured retention period."""
@@ -166,21 +333,41 @@ def cleanup_old_data():
     cutoff_time = time.time() - (retention_hours * 3600)
     
     try:
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM sensor_data WHERE timestamp < ?', (cutoff_time,))
-        deleted_rows = cursor.rowcount
-        conn.commit()
-        conn.close()
+        conn = get_db_writer_connection()
+        deleted_rows = 0
+        while True:
+            # Delete in windows along the primary key (timestamp first) so each
+            # transaction holds the write lock briefly and the WAL stays small
+            batch_end = conn.execute(
+                'SELECT timestamp FROM sensor_data WHERE timestamp < ? ORDER BY timestamp LIMIT 1 OFFSET ?',
+                (cutoff_time, CLEANUP_BATCH_ROWS - 1)
+            ).fetchone()
+            with conn:
+                if batch_end is None:
+                    # Last (partial) window
+                    deleted_rows += conn.execute('DELETE FROM sensor_data WHERE timestamp < ?', (cutoff_time,)).rowcount
+                else:
+                    deleted_rows += conn.execute('DELETE FROM sensor_data WHERE timestamp <= ?', batch_end).rowcount
+            if batch_end is None:
+                break
+            socketio.sleep(0)  # Let the sensor loop and API readers run between windows
+        
         if deleted_rows > 0:
-            print(f"Cleaned up {deleted_rows} old sensor data rows (retention: {retention_hours}h)")
+            # Shrink the database file by a bounded number of pages (no-op unless
+            # auto_vacuum is INCREMENTAL). executescript() steps the pragma to
+            # completion - execute() would only free a single page
+            conn.executescript(f'PRAGMA incremental_vacuum({CLEANUP_VACUUM_PAGES});')
+            # Give the WAL file's space back after a large delete
+            conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            logger.info(f"Cleaned up {deleted_rows} old sensor data rows (retention: {retention_hours}h)")
     except Exception as e:
-        print(f"Error cleaning up database: {e}")
+        logger.error(f"Error cleaning up database: {e}")
+        close_db_writer_connection()
 
 # Initialize database on startup
 init_database()
 
-# Default settings
+# Default settings - a template, use default_settings() for a private copy
 DEFAULT_SETTINGS = {
     'updateInterval': UPDATE_INTERVAL_MS,  # Fixed at 500ms
     'darkMode': False,
@@ -193,6 +380,10 @@ DEFAULT_SETTINGS = {
     'sensors': []
 }
 
+def default_settings():
+    """Fresh copy of DEFAULT_SETTINGS - the nested 'sensors' list is not shared."""
+    return copy.deepcopy(DEFAULT_SETTINGS)
+
 # Default sensor configurations (when no sensors are configured)
 DEFAULT_SENSORS = [
     {'id': 'velocity', 'name': 'Velocity', 'type': 'mock', 'unit': 'm/s', 'color': '#e74c3c', 'enabled': True, 'config': {}},
@@ -413,6 +604,10 @@ SENSOR_TYPES = {
 # Sensor initialization cache and handlers
 sensor_instances = {}  # Cache initialized sensors {sensor_id: instance}
 sensor_last_values = {}  # Cache last reading from each sensor {sensor_id: value}
+sensor_plan = None  # Flattened per-tick sensor plan, rebuilt after settings change
+settings_mtime_ns = None  # SETTINGS_FILE mtime as last loaded/saved by this process
+calculated_results = {}  # Last good calculated value {sensor_id: (formula, inputs, result)}
+api_response_cache = {}  # Serialized GET responses {endpoint: (body, etag)}, cleared when settings or libraries change
 
 # UDP sensor data storage
 udp_sensor_data = {}  # {sensor_id: {'value': float, 'timestamp': float, 'port': int, 'source_ip': str}}
@@ -593,11 +788,37 @@ pid_state = {
 
 available_sensor_libraries = {}  # Track which libraries are installed
 import importlib
+import importlib.util
 import math
 
+# Loaded hardware library modules {module_name: module}, shared by all init_*/read_* handlers
+_lib_cache = {}
+
+def _lib(name):
+    """Import a hardware library module once and return the cached module object"""
+    module = _lib_cache.get(name)
+    if module is None:
+        module = importlib.import_module(name)
+        _lib_cache[name] = module
+    return module
+
+# Drivers that touch the hardware as soon as they're imported. find_spec() sees
+# them on any host, so they are imported once by the availability check and
+# reported unavailable if that raises (e.g. off the Pi). Blinka-backed adafruit_*
+# drivers all need 'board', which fails the same way.
+HARDWARE_IMPORT_PROBES = ('adafruit_dht', 'w1thermsensor')
+
+def hardware_import_probe(module_name):
+    """Module to import to prove an installed driver can run here, or None if finding it is enough"""
+    if module_name in HARDWARE_IMPORT_PROBES:
+        return module_name
+    if module_name.startswith('adafruit_'):
+        return 'board'
+    return None
+
 # Function to check which sensor libraries are available
 def check_sensor_library_availability():
-    """Check which sensor hardware libraries are installed and working."""
+    """Check which sensor hardware libraries are installed and can run on this host."""
     global available_sensor_libraries
     
     library_checks = {
@@ -615,38 +836,71 @@ def check_sensor_library_availability():
         'VL53L0X': 'adafruit_vl53l0x'
     }
     
+    # Pick up libraries installed since the last check
+    importlib.invalidate_caches()
+    probe_errors = {}  # {probe module: exception or None} - 'board' is probed once
+    
     for sensor_type, module_name in library_checks.items():
+        # find_spec only locates the module - most drivers are imported on
+        # first use by _lib(), not at startup
         try:
-            # Invalidate import cache to force fresh check
-            if module_name in sys.modules:
-                importlib.reload(sys.modules[module_name])
-            else:
-                importlib.import_module(module_name)
-            available_sensor_libraries[sensor_type] = True
-            print(f"✓ {sensor_type} library available")
-        except (ImportError, ModuleNotFoundError) as e:
-            available_sensor_libraries[sensor_type] = False
-            print(f"✗ {sensor_type} library not available (not installed)")
-        except RuntimeError as e:
-            # Library is installed but can't run (e.g., RPi.GPIO on non-Pi)
-            if "Raspberry Pi" in str(e) or "GPIO" in str(e):
-                available_sensor_libraries[sensor_type] = False
-                print(f"⚠ {sensor_type} library installed but requires Raspberry Pi hardware")
-            else:
-                available_sensor_libraries[sensor_type] = False
-                print(f"✗ {sensor_type} library error: {e}")
+            found = importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            # Parent package of a dotted name is missing
+            found = False
         except Exception as e:
-            # Catch any other import errors
             available_sensor_libraries[sensor_type] = False
             print(f"✗ {sensor_type} library error: {e}")
+            continue
+        
+        probe = hardware_import_probe(module_name) if found else None
+        if probe is not None:
+            if probe not in probe_errors:
+                try:
+                    _lib(probe)
+                    probe_errors[probe] = None
+                except Exception as e:
+                    probe_errors[probe] = e
+            if probe_errors[probe] is not None:
+                available_sensor_libraries[sensor_type] = False
+                print(f"⚠ {sensor_type} library installed but can't run here: {probe_errors[probe]}")
+                continue
+        
+        available_sensor_libraries[sensor_type] = found
+        if found:
+            print(f"✓ {sensor_type} library available")
+        else:
+            print(f"✗ {sensor_type} library not available (not installed)")
     
     print(f"Library check complete: {sum(available_sensor_libraries.values())}/{len(available_sensor_libraries)} available")
+    api_response_cache.clear()
     return available_sensor_libraries
 
 # Check sensor library availability at startup
 check_sensor_library_availability()
 
 # Sensor handler functions
+
+# HX711 smoothing factor for the exponential moving average (higher = less smoothing)
+HX711_EMA_ALPHA = 0.3
+
+# gpiochip that carries the 40-pin header GPIOs, keyed by board model prefix
+GPIOCHIP_BY_MODEL = (('Raspberry Pi 5', 4), ('Raspberry Pi 4', 0))
+
+def detect_gpiochip_num():
+    """Return the header gpiochip number for this board, or None if unknown"""
+    try:
+        with open('/proc/device-tree/model', 'rb') as f:
+            model = f.read().rstrip(b'\x00').decode('ascii', 'replace')
+    except OSError:
+        return None
+    for prefix, chip in GPIOCHIP_BY_MODEL:
+        if model.startswith(prefix):
+            return chip
+    return None
+
+GPIOCHIP_NUM = detect_gpiochip_num()
+
 def init_hx711(config):
     """Initialize HX711 load cell amplifier using lgpio directly"""
     try:
@@ -654,21 +908,22 @@ def init_hx711(config):
         hx711_logger.info("HX711 INITIALIZATION START")
         hx711_logger.info("=" * 60)
         
-        import lgpio
-        import time
-        import os
-        import glob
+        lgpio = _lib('lgpio')
         
         dout = int(config.get('dout_pin', 5))
         sck = int(config.get('pd_sck_pin', 6))
         
-        hx711_logger.info(f"Configuration: DOUT=GPIO{dout}, SCK=GPIO{sck}")
-        hx711_logger.info(f"Physical pins: DOUT=Pin{dout_to_physical(dout)}, SCK=Pin{sck_to_physical(sck)}")
+        hx711_logger.info("Configuration: DOUT=GPIO%s, SCK=GPIO%s", dout, sck)
+        hx711_logger.info("Physical pins: DOUT=Pin%s, SCK=Pin%s", dout_to_physical(dout), sck_to_physical(sck))
         hx711_logger.info("Using lgpio backend for Raspberry Pi 5")
         
-        # Check available gpiochip devices
-        gpiochips = glob.glob('/dev/gpiochip*')
-        hx711_logger.info(f"Available gpiochip devices: {gpiochips}")
+        # Try the board's known header chip first, then any other chip present
+        chip_order = list(range(10))
+        if GPIOCHIP_NUM is not None:
+            chip_order.remove(GPIOCHIP_NUM)
+            chip_order.insert(0, GPIOCHIP_NUM)
+        gpiochips = [chip for chip in chip_order if os.path.exists(f'/dev/gpiochip{chip}')]
+        hx711_logger.info("Available gpiochip devices: %s (board default: %s)", gpiochips, GPIOCHIP_NUM)
         
         if not gpiochips:
             hx711_logger.error("No /dev/gpiochip* devices found!")
@@ -679,24 +934,32 @@ def init_hx711(config):
         chip_handle = None
         chip_num = None
         last_error = None
-        hx711_logger.info(f"lgpio module location: {lgpio.__file__}")
-        hx711_logger.info(f"Current process UID: {os.getuid()}, GID: {os.getgid()}, Groups: {os.getgroups()}")
+        # Per-chip diagnostics only at DEBUG level
+        debug = hx711_logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            hx711_logger.debug("lgpio module location: %s", lgpio.__file__)
+            hx711_logger.debug("Current process UID: %s, GID: %s, Groups: %s", os.getuid(), os.getgid(), os.getgroups())
         
-        for chip in range(10):
+        for chip in gpiochips:
             try:
-                hx711_logger.info(f"Attempting to open /dev/gpiochip{chip}...")
+                if debug:
+                    hx711_logger.debug("Attempting to open /dev/gpiochip%s...", chip)
                 h = lgpio.gpiochip_open(chip)
-                hx711_logger.info(f"Successfully opened gpiochip{chip}, handle: {h}")
+                if debug:
+                    hx711_logger.debug("Successfully opened gpiochip%s, handle: %s", chip, h)
                 lgpio.gpio_claim_input(h, dout)
-                hx711_logger.info(f"Claimed GPIO{dout} as input")
+                if debug:
+                    hx711_logger.debug("Claimed GPIO%s as input", dout)
                 lgpio.gpio_claim_output(h, sck, 0)
-                hx711_logger.info(f"Claimed GPIO{sck} as output")
+                if debug:
+                    hx711_logger.debug("Claimed GPIO%s as output", sck)
                 chip_handle = h
                 chip_num = chip
                 break
             except Exception as e:
-                last_error = f"chip{chip}: {type(e).__name__}: {str(e)}"
-                hx711_logger.info(f"Failed on chip{chip}: {last_error}")
+                last_error = e
+                if debug:
+                    hx711_logger.debug("Failed on chip%s: %s: %s", chip, type(e).__name__, e)
                 try:
                     # Try to free any claimed GPIOs before closing
                     try:
@@ -712,12 +975,12 @@ def init_hx711(config):
                     pass
         
         if chip_handle is None:
-            hx711_logger.error(f"Could not claim GPIO pins on any gpiochip")
-            hx711_logger.error(f"Last error: {last_error}")
+            hx711_logger.error("Could not claim GPIO pins on any gpiochip")
+            hx711_logger.error("Last error: %s: %s", type(last_error).__name__, last_error)
             hx711_logger.error("Make sure python3-lgpio is installed: sudo apt-get install python3-lgpio")
             return None
         
-        hx711_logger.info(f"Using /dev/gpiochip{chip_num}")
+        hx711_logger.info("Using /dev/gpiochip%s", chip_num)
         
         # Store configuration in a dict (our "sensor object")
         # Handle None values from config
@@ -736,7 +999,9 @@ def init_hx711(config):
             'sck': sck,
             'reference_unit': float(reference_unit),
             'offset': float(offset),
-            'channel': config.get('channel', 'A-128')
+            'channel': config.get('channel', 'A-128'),
+            'ema': None,  # Smoothed raw value, seeded by the first reading
+            'alpha': HX711_EMA_ALPHA
         }
         
         # Test read to verify hardware
@@ -750,54 +1015,60 @@ def init_hx711(config):
                 lgpio.gpiochip_close(chip_handle)
                 return None
         except Exception as e:
-            hx711_logger.error(f"Hardware test failed: {e}")
+            hx711_logger.error("Hardware test failed: %s", e)
             lgpio.gpiochip_close(chip_handle)
             return None
         
+        hx_dict['ema'] = float(test_val)
+        
         hx711_logger.info("=" * 60)
-        hx711_logger.info(f"✓ HX711 SUCCESSFULLY INITIALIZED - Raw value: {test_val}")
+        hx711_logger.info("✓ HX711 SUCCESSFULLY INITIALIZED - Raw value: %s", test_val)
         hx711_logger.info("=" * 60)
         return hx_dict
         
     except ImportError as e:
-        hx711_logger.error(f"lgpio not available: {e}")
+        hx711_logger.error("lgpio not available: %s", e)
         hx711_logger.error("Install with: sudo apt-get install python3-lgpio")
         return None
     except Exception as e:
-        hx711_logger.error(f"Initialization failed: {e}")
-        import traceback
-        traceback.print_exc()
+        hx711_logger.exception("Initialization failed: %s", e)
         return None
 
+# Extra SCK pulses after the 24 data bits that select the next conversion's channel/gain
+HX711_GAIN_PULSES = {'A-128': 1, 'A-64': 3, 'B-32': 2}
+
 def _hx711_read_raw(hx_dict):
     """Read raw 24-bit value from HX711 using lgpio"""
-    import lgpio
-    import time
+    lgpio = _lib('lgpio')
+    # Bound once - the bit loop below calls these 50+ times per read, and SCK
+    # must not stay high for more than 60 us or the HX711 powers down
+    gpio_read = lgpio.gpio_read
+    gpio_write = lgpio.gpio_write
     
     h = hx_dict['handle']
     dout = hx_dict['dout']
     sck = hx_dict['sck']
     
-    # Wait for data ready (DT goes low)
-    timeout = time.time() + 1.0
-    while lgpio.gpio_read(h, dout) == 1:
-        if time.time() > timeout:
+    # Wait for data ready (DT goes low). At 10 SPS a conversion is normally
+    # already waiting when the 200 ms tick arrives, so this rarely loops.
+    deadline = time.monotonic_ns() + 1_000_000_000
+    while gpio_read(h, dout):
+        if time.monotonic_ns() > deadline:
             return None
         time.sleep(0.001)
     
     count = 0
     # Read 24 bits
     for _ in range(24):
-        lgpio.gpio_write(h, sck, 1)
-        count = (count << 1) | (1 if lgpio.gpio_read(h, dout) else 0)
-        lgpio.gpio_write(h, sck, 0)
+        gpio_write(h, sck, 1)
+        count = (count << 1) | (1 if gpio_read(h, dout) else 0)
+        gpio_write(h, sck, 0)
     
     # Set gain/channel with extra pulses
-    channel = hx_dict.get('channel', 'A-128')
-    pulses = {'A-128': 1, 'A-64': 3, 'B-32': 2}.get(channel, 1)
+    pulses = HX711_GAIN_PULSES.get(hx_dict.get('channel', 'A-128'), 1)
     for _ in range(pulses):
-        lgpio.gpio_write(h, sck, 1)
-        lgpio.gpio_write(h, sck, 0)
+        gpio_write(h, sck, 1)
+        gpio_write(h, sck, 0)
     
     # Convert from 24-bit two's complement to signed int
     if count & 0x800000:
@@ -821,32 +1092,30 @@ def read_hx711(sensor, config):
         if sensor is None:
             return 0
         
-        import time
-        
-        # Take multiple readings and average
-        readings = []
-        for _ in range(3):
-            raw = _hx711_read_raw(sensor)
-            if raw is not None:
-                readings.append(raw)
-            time.sleep(0.01)
-        
-        if not readings:
+        # Single conversion per tick - smoothing is done by the EMA below
+        # instead of blocking on several back-to-back conversions
+        raw = _hx711_read_raw(sensor)
+        if raw is None:
             hx711_logger.warning("No valid readings from HX711")
             return 0
         
-        # Average the readings
-        raw_avg = sum(readings) / len(readings)
+        ema = sensor.get('ema')
+        if ema is None:
+            ema = float(raw)
+        else:
+            alpha = sensor.get('alpha', HX711_EMA_ALPHA)
+            ema = alpha * raw + (1 - alpha) * ema
+        sensor['ema'] = ema
         
         # Apply calibration: (raw - offset) / reference_unit
         offset = sensor.get('offset', 0)
         reference_unit = sensor.get('reference_unit', 1)
         
-        value = (raw_avg - offset) / reference_unit
+        value = (ema - offset) / reference_unit
         return value
         
     except Exception as e:
-        hx711_logger.error(f"Error reading sensor: {e}")
+        hx711_logger.error("Error reading sensor: %s", e)
         return 0
 
 def cleanup_hx711(sensor):
@@ -855,7 +1124,7 @@ def cleanup_hx711(sensor):
         if sensor is None:
             return
         
-        import lgpio
+        lgpio = _lib('lgpio')
         
         handle = sensor.get('handle')
         dout = sensor.get('dout')
@@ -875,11 +1144,11 @@ def cleanup_hx711(sensor):
             # Close gpiochip
             try:
                 lgpio.gpiochip_close(handle)
-                hx711_logger.info(f"HX711 cleaned up: freed GPIO{dout}, GPIO{sck}")
+                hx711_logger.info("HX711 cleaned up: freed GPIO%s, GPIO%s", dout, sck)
             except:
                 pass
     except Exception as e:
-        hx711_logger.error(f"Error cleaning up HX711: {e}")
+        hx711_logger.error("Error cleaning up HX711: %s", e)
 
 # ==================== FAN PWM CONTROL ====================
 
@@ -912,9 +1181,7 @@ def init_fan_pwm():
         print(f"✓ Pin class: {_pwm_device.pin.__class__.__name__}")
         return True
     except Exception as e:
-        print(f"✗ Failed to initialize fan PWM: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("✗ Failed to initialize fan PWM: %s", e)
         return False
 
 def set_fan_speed(speed_percent):
@@ -954,9 +1221,7 @@ def set_fan_speed(speed_percent):
         return True
         
     except Exception as e:
-        print(f"❌ Error setting fan speed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error setting fan speed: %s", e)
         return False
         return False
 
@@ -977,7 +1242,6 @@ def cleanup_fan_pwm():
 
 def check_fan_safety():
     """Monitor client heartbeat and stop fan if connection is lost"""
-    import time
     while True:
         try:
             if FAN_SAFETY_TIMEOUT > 0 and fan_state['running'] and fan_state['last_heartbeat'] is not None:
@@ -989,10 +1253,10 @@ def check_fan_safety():
                         'reason': 'Client connection lost',
                         'timeout': FAN_SAFETY_TIMEOUT
                     })
-            time.sleep(1)  # Check every second
+            socketio.sleep(1)  # Check every second
         except Exception as e:
             print(f"Error in fan safety monitor: {e}")
-            time.sleep(1)
+            socketio.sleep(1)
 
 def pid_control_loop():
     """
@@ -1000,7 +1264,6 @@ def pid_control_loop():
     Runs at ~10Hz (100ms updates).
     """
     global pid_state
-    import threading
     
     logger.info("PID control loop started")
     
@@ -1063,21 +1326,23 @@ def pid_control_loop():
             logger.error(f"Error in PID control loop: {e}")
             time.sleep(0.1)
 
+# ADS1115 PGA gain by configured value
+ADS1115_GAINS = {'2/3': 2/3, '1': 1, '2': 2, '4': 4, '8': 8, '16': 16}
+
 def init_ads1115(config):
     """Initialize ADS1115 ADC"""
     try:
-        import board
-        import busio
-        import adafruit_ads1x15.ads1115 as ADS
-        from adafruit_ads1x15.analog_in import AnalogIn
+        board = _lib('board')
+        busio = _lib('busio')
+        ADS = _lib('adafruit_ads1x15.ads1115')
+        AnalogIn = _lib('adafruit_ads1x15.analog_in').AnalogIn
         
         i2c = busio.I2C(board.SCL, board.SDA)
         address = int(config.get('address', '0x48'), 16)
         ads = ADS.ADS1115(i2c, address=address)
         
         # Set gain
-        gain_map = {'2/3': 2/3, '1': 1, '2': 2, '4': 4, '8': 8, '16': 16}
-        ads.gain = gain_map.get(config.get('gain', '1'), 1)
+        ads.gain = ADS1115_GAINS.get(config.get('gain', '1'), 1)
         
         # Set data rate
         ads.data_rate = int(config.get('data_rate', '128'))
@@ -1099,15 +1364,15 @@ def read_ads1115(sensor, config):
             return 0
         return sensor['channel'].voltage
     except Exception as e:
-        print(f"Error reading ADS1115: {e}")
+        sensor_logger.error(f"Error reading ADS1115: {e}")
         return 0
 
 def init_bmp280(config):
     """Initialize BMP280 pressure/temperature sensor"""
     try:
-        import board
-        import busio
-        import adafruit_bmp280
+        board = _lib('board')
+        busio = _lib('busio')
+        adafruit_bmp280 = _lib('adafruit_bmp280')
         
         i2c = busio.I2C(board.SCL, board.SDA)
         address = int(config.get('address', '0x76'), 16)
@@ -1133,17 +1398,17 @@ def read_bmp280(sensor, config, output='pressure'):
         else:  # pressure
             return sensor.pressure
     except Exception as e:
-        print(f"Error reading BMP280: {e}")
+        sensor_logger.error(f"Error reading BMP280: {e}")
         return 0
 
 def init_sdp811(config):
     """Initialize SDP811 differential pressure sensor"""
     try:
-        from sensirion_i2c_driver import LinuxI2cTransceiver, I2cConnection
-        from sensirion_i2c_sdp import Sdp8xxI2cDevice
+        sensirion_i2c_driver = _lib('sensirion_i2c_driver')
+        Sdp8xxI2cDevice = _lib('sensirion_i2c_sdp').Sdp8xxI2cDevice
         
-        i2c_transceiver = LinuxI2cTransceiver('/dev/i2c-1')
-        i2c_connection = I2cConnection(i2c_transceiver)
+        i2c_transceiver = sensirion_i2c_driver.LinuxI2cTransceiver('/dev/i2c-1')
+        i2c_connection = sensirion_i2c_driver.I2cConnection(i2c_transceiver)
         
         address = int(config.get('address', '0x25'), 16)
         sensor = Sdp8xxI2cDevice(i2c_connection, slave_address=address)
@@ -1156,7 +1421,15 @@ def init_sdp811(config):
             sensor.start_continuous_measurement()
         
         print(f"SDP811 initialized at {config.get('address')}")
-        return {'sensor': sensor, 'altitude': float(config.get('altitude', 0))}
+        altitude = float(config.get('altitude', 0))
+        # Barometric pressure at the configured altitude (standard atmosphere)
+        pressure_pa = 101325 * (1 - 0.0065 * altitude / 288.15) ** 5.255
+        return {
+            'sensor': sensor,
+            'altitude': altitude,
+            # v = sqrt(2*dP/rho) with rho = p / (R*T)  ->  v = sqrt(dP * T * 2R/p)
+            'airspeed_factor': 2 * 287.05 / pressure_pa
+        }
     except Exception as e:
         print(f"Error initializing SDP811: {e}")
         return None
@@ -1175,28 +1448,35 @@ def read_sdp811(sensor_data, config, output='airspeed'):
         elif output == 'temperature':
             return temp_c
         else:  # airspeed - calculate from differential pressure
-            # Air density calculation
-            altitude = sensor_data.get('altitude', 0)
+            # Airspeed from Bernoulli equation: v = sqrt(2*dP/rho), with the air
+            # density's pressure term precomputed at init
             temp_k = temp_c + 273.15
-            pressure_pa = 101325 * (1 - 0.0065 * altitude / 288.15) ** 5.255
-            rho = pressure_pa / (287.05 * temp_k)  # kg/m³
-            
-            # Airspeed from Bernoulli equation: v = sqrt(2*dP/rho)
+            airspeed_squared = dp_pa * temp_k * sensor_data['airspeed_factor']
             if dp_pa < 0:
-                return -math.sqrt(abs(2 * dp_pa / rho))
-            return math.sqrt(2 * dp_pa / rho)
+                return -math.sqrt(-airspeed_squared)
+            return math.sqrt(airspeed_squared)
     except Exception as e:
-        print(f"Error reading SDP811: {e}")
+        sensor_logger.error(f"Error reading SDP811: {e}")
         return 0
 
+# Resolved board.D<n> pin objects {pin_num: pin}
+_board_pins = {}
+
+def _board_pin(board, pin_num):
+    """Return board.D<pin_num>, resolving the attribute only once per pin"""
+    pin = _board_pins.get(pin_num)
+    if pin is None:
+        pin = _board_pins[pin_num] = getattr(board, f'D{pin_num}')
+    return pin
+
 def init_dht22(config):
     """Initialize DHT22 temperature/humidity sensor"""
     try:
-        import adafruit_dht
-        import board
+        adafruit_dht = _lib('adafruit_dht')
+        board = _lib('board')
         
         pin_num = int(config.get('pin', 4))
-        pin = getattr(board, f'D{pin_num}')
+        pin = _board_pin(board, pin_num)
         sensor = adafruit_dht.DHT22(pin)
         
         print(f"DHT22 initialized on pin {pin_num}")
@@ -1215,13 +1495,13 @@ def read_dht22(sensor, config, output='temperature'):
         else:  # temperature
             return sensor.temperature
     except Exception as e:
-        print(f"Error reading DHT22: {e}")
+        sensor_logger.error(f"Error reading DHT22: {e}")
         return 0
 
 def init_ds18b20(config):
     """Initialize DS18B20 temperature sensor"""
     try:
-        from w1thermsensor import W1ThermSensor, Unit
+        W1ThermSensor = _lib('w1thermsensor').W1ThermSensor
         
         address = config.get('address', '').strip()
         if address:
@@ -1240,20 +1520,19 @@ def read_ds18b20(sensor, config):
     try:
         if sensor is None:
             return 0
-        from w1thermsensor import Unit
-        return sensor.get_temperature(Unit.DEGREES_C)
+        return sensor.get_temperature(_lib('w1thermsensor').Unit.DEGREES_C)
     except Exception as e:
-        print(f"Error reading DS18B20: {e}")
+        sensor_logger.error(f"Error reading DS18B20: {e}")
         return 0
 
 def init_mcp3008(config):
     """Initialize MCP3008 ADC"""
     try:
-        import busio
-        import digitalio
-        import board
-        import adafruit_mcp3xxx.mcp3008 as MCP
-        from adafruit_mcp3xxx.analog_in import AnalogIn
+        busio = _lib('busio')
+        digitalio = _lib('digitalio')
+        board = _lib('board')
+        MCP = _lib('adafruit_mcp3xxx.mcp3008')
+        AnalogIn = _lib('adafruit_mcp3xxx.analog_in').AnalogIn
         
         spi = busio.SPI(clock=board.SCK, MISO=board.MISO, MOSI=board.MOSI)
         cs = digitalio.DigitalInOut(board.CE0)
@@ -1275,22 +1554,40 @@ def read_mcp3008(sensor, config):
             return 0
         return sensor['channel'].voltage
     except Exception as e:
-        print(f"Error reading MCP3008: {e}")
+        sensor_logger.error(f"Error reading MCP3008: {e}")
         return 0
 
+# MPU6050 data registers ACCEL_XOUT_H..GYRO_ZOUT_L: accel xyz, temperature, gyro xyz (big-endian int16)
+MPU6050_DATA_REGISTER = 0x3B
+MPU6050_DATA_FORMAT = struct.Struct('>7h')
+# Outputs of one device read within the same tick share a single block read
+MPU6050_BLOCK_MAX_AGE = UPDATE_INTERVAL_MS / 2000
+mpu6050_blocks = {}  # {address: (monotonic read time, {output: value})}
+# Raw counts per unit for each range register value, as used by adafruit_mpu6050
+MPU6050_ACCEL_LSB_PER_G = (16384, 8192, 4096, 2048)
+MPU6050_GYRO_LSB_PER_DPS = (131, 65.5, 32.8, 16.4)
+STANDARD_GRAVITY = 9.80665  # m/s^2 per g
+
 def init_mpu6050(config):
     """Initialize MPU6050 gyro/accelerometer"""
     try:
-        import board
-        import busio
-        import adafruit_mpu6050
+        board = _lib('board')
+        busio = _lib('busio')
+        adafruit_mpu6050 = _lib('adafruit_mpu6050')
         
         i2c = busio.I2C(board.SCL, board.SDA)
         address = int(config.get('address', '0x68'), 16)
         sensor = adafruit_mpu6050.MPU6050(i2c, address)
         
         print(f"MPU6050 initialized at {config.get('address')}")
-        return sensor
+        # The range settings are registers - read them once here so a tick
+        # costs only the data block read
+        return {
+            'device': sensor,
+            'address': address,
+            'accel_lsb': MPU6050_ACCEL_LSB_PER_G[sensor.accelerometer_range],
+            'gyro_lsb': MPU6050_GYRO_LSB_PER_DPS[sensor.gyro_range]
+        }
     except Exception as e:
         print(f"Error initializing MPU6050: {e}")
         return None
@@ -1303,29 +1600,45 @@ def read_mpu6050(sensor, config):
         
         output = config.get('output', 'accel_x')
         
-        if output == 'accel_x':
-            return sensor.acceleration[0]
-        elif output == 'accel_y':
-            return sensor.acceleration[1]
-        elif output == 'accel_z':
-            return sensor.acceleration[2]
-        elif output == 'gyro_x':
-            return sensor.gyro[0]
-        elif output == 'gyro_y':
-            return sensor.gyro[1]
-        elif output == 'gyro_z':
-            return sensor.gyro[2]
-        elif output == 'temperature':
-            return sensor.temperature
-        return 0
+        # Every configured output of a device is a separate sensor entry -
+        # the first one read in a tick fetches all registers for the rest
+        address = sensor['address']
+        now = time.monotonic()
+        cached = mpu6050_blocks.get(address)
+        if cached is not None and now - cached[0] <= MPU6050_BLOCK_MAX_AGE:
+            values = cached[1]
+        else:
+            values = _mpu6050_read_block(sensor)
+            mpu6050_blocks[address] = (now, values)
+        return values.get(output, 0)
     except Exception as e:
-        print(f"Error reading MPU6050: {e}")
+        sensor_logger.error(f"Error reading MPU6050: {e}")
         return 0
 
+def _mpu6050_read_block(sensor):
+    """Read accel, temperature and gyro in one 14-byte I2C transaction, scaled like adafruit_mpu6050"""
+    buffer = bytearray(MPU6050_DATA_FORMAT.size)
+    with sensor['device'].i2c_device as i2c:
+        i2c.write_then_readinto(bytes((MPU6050_DATA_REGISTER,)), buffer)
+    accel_x, accel_y, accel_z, temperature, gyro_x, gyro_y, gyro_z = MPU6050_DATA_FORMAT.unpack(buffer)
+    
+    # Scaled with the ranges read at init - m/s^2 and rad/s like the library properties
+    accel_scale = 1.0 / sensor['accel_lsb']
+    gyro_lsb = sensor['gyro_lsb']
+    return {
+        'accel_x': accel_x * accel_scale * STANDARD_GRAVITY,
+        'accel_y': accel_y * accel_scale * STANDARD_GRAVITY,
+        'accel_z': accel_z * accel_scale * STANDARD_GRAVITY,
+        'gyro_x': math.radians(gyro_x / gyro_lsb),
+        'gyro_y': math.radians(gyro_y / gyro_lsb),
+        'gyro_z': math.radians(gyro_z / gyro_lsb),
+        'temperature': temperature / 340.0 + 36.53
+    }
+
 def init_xgzp6847a(config):
     """Initialize XGZP6847A differential pressure sensor"""
     try:
-        from smbus2 import SMBus
+        SMBus = _lib('smbus2').SMBus
         
         address = int(config.get('address', '0x6D'), 16)
         bus = SMBus(1)  # I2C bus 1
@@ -1376,15 +1689,15 @@ def read_xgzp6847a(sensor, config):
         
         return pressure_pa
     except Exception as e:
-        print(f"Error reading XGZP6847A: {e}")
+        sensor_logger.error(f"Error reading XGZP6847A: {e}")
         return 0
 
 def init_bme280(config):
     """Initialize BME280 environmental sensor"""
     try:
-        import board
-        import busio
-        import adafruit_bme280
+        board = _lib('board')
+        busio = _lib('busio')
+        adafruit_bme280 = _lib('adafruit_bme280')
         
         i2c = busio.I2C(board.SCL, board.SDA)
         address = int(config.get('address', '0x77'), 16)
@@ -1417,15 +1730,15 @@ def read_bme280(sensor, config):
             return sensor.altitude  # meters
         return 0
     except Exception as e:
-        print(f"Error reading BME280: {e}")
+        sensor_logger.error(f"Error reading BME280: {e}")
         return 0
 
 def init_ina219(config):
     """Initialize INA219 current sensor"""
     try:
-        import board
-        import busio
-        import adafruit_ina219
+        board = _lib('board')
+        busio = _lib('busio')
+        adafruit_ina219 = _lib('adafruit_ina219')
         
         i2c = busio.I2C(board.SCL, board.SDA)
         address = int(config.get('address', '0x40'), 16)
@@ -1453,15 +1766,15 @@ def read_ina219(sensor, config):
             return sensor.power  # mW
         return 0
     except Exception as e:
-        print(f"Error reading INA219: {e}")
+        sensor_logger.error(f"Error reading INA219: {e}")
         return 0
 
 def init_vl53l0x(config):
     """Initialize VL53L0X distance sensor"""
     try:
-        import board
-        import busio
-        import adafruit_vl53l0x
+        board = _lib('board')
+        busio = _lib('busio')
+        adafruit_vl53l0x = _lib('adafruit_vl53l0x')
         
         i2c = busio.I2C(board.SCL, board.SDA)
         sensor = adafruit_vl53l0x.VL53L0X(i2c)
@@ -1488,9 +1801,65 @@ def read_vl53l0x(sensor, config):
             return 0
         return sensor.range  # mm
     except Exception as e:
-        print(f"Error reading VL53L0X: {e}")
+        sensor_logger.error(f"Error reading VL53L0X: {e}")
         return 0
 
+# Formula validation - AST node types a sensor formula may contain
+FORMULA_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Name, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd
+)
+FORCE_BALANCE_NAMES = frozenset(('s1', 's2', 's3'))
+# Calculated sensors may also call the functions in CALCULATED_FORMULA_GLOBALS
+CALCULATED_FORMULA_ALLOWED_NODES = FORMULA_ALLOWED_NODES + (ast.Call,)
+
+# Functions available to calculated sensor formulas
+CALCULATED_FORMULA_GLOBALS = {
+    'sqrt': lambda x: math.sqrt(max(0, x)),  # Prevent negative sqrt
+    'pow': math.pow,
+    'abs': abs,
+    'max': max,
+    'min': min,
+    'sin': math.sin,
+    'cos': math.cos,
+    'tan': math.tan,
+    'log': math.log,
+    'log10': math.log10,
+    'exp': math.exp,
+    'pi': math.pi,
+    'e': math.e,
+    '__builtins__': {}  # Restrict access to built-in functions
+}
+
+def compile_formula(formula, allowed_names):
+    """
+    Validate a formula against the AST whitelist and compile it for eval.
+
+    Args:
+        formula: Formula string ('^' is accepted as power operator)
+        allowed_names: Variable names the formula may reference
+
+    Returns:
+        Compiled code object
+
+    Raises:
+        ValueError: If the formula contains anything outside the whitelist
+    """
+    try:
+        tree = ast.parse(str(formula).replace('^', '**'), mode='eval')
+    except SyntaxError:
+        raise ValueError("invalid syntax")
+
+    for node in ast.walk(tree):
+        if not isinstance(node, FORMULA_ALLOWED_NODES):
+            raise ValueError(f"unsupported element '{type(node).__name__}'")
+        if isinstance(node, ast.Constant) and type(node.value) not in (int, float):
+            raise ValueError(f"unsupported constant {node.value!r}")
+        if isinstance(node, ast.Name) and node.id not in allowed_names:
+            raise ValueError(f"unknown name '{node.id}'")
+
+    return compile(tree, '<formula>', 'eval')
+
 def init_force_balance(config):
     """Initialize force balance sensor - no hardware init needed, just config validation"""
     try:
@@ -1504,7 +1873,7 @@ def init_force_balance(config):
             return None
         
         # Return config as "instance" - we'll use it during reads
-        return {
+        instance = {
             'config': config,
             'calibration': config.get('calibration', {
                 'tare_offsets': [0, 0, 0],
@@ -1512,10 +1881,23 @@ def init_force_balance(config):
                 'is_calibrated': False
             })
         }
+        prepare_force_balance_formula(instance, config['formula'])
+        return instance
     except Exception as e:
         print(f"Error initializing force balance: {e}")
         return None
 
+def prepare_force_balance_formula(instance, formula):
+    """Validate and compile the geometric formula once, storing the result on the instance"""
+    instance['formula'] = formula
+    try:
+        instance['formula_code'] = compile_formula(formula, FORCE_BALANCE_NAMES)
+        instance['formula_valid'] = True
+    except ValueError as e:
+        print(f"Warning: Invalid force balance formula '{formula}': {e}")
+        instance['formula_code'] = None
+        instance['formula_valid'] = False
+
 def read_force_balance(instance, config):
     """Read force balance value using geometric formula and calibration"""
     try:
@@ -1527,16 +1909,16 @@ def read_force_balance(instance, config):
         s2_id = config.get('source_sensor_2')
         s3_id = config.get('source_sensor_3')
         
-        # Debug: Log what we're looking for and what's available
-        print(f"Force balance looking for: s1={s1_id}, s2={s2_id}, s3={s3_id}")
-        print(f"Available sensor values: {list(sensor_last_values.keys())}")
-        
         # Read raw values from source sensors
         raw_s1 = sensor_last_values.get(s1_id, 0)
         raw_s2 = sensor_last_values.get(s2_id, 0)
         raw_s3 = sensor_last_values.get(s3_id, 0)
         
-        print(f"Raw values: s1={raw_s1}, s2={raw_s2}, s3={raw_s3}")
+        # Runs every tick - only build the diagnostics when DEBUG is on
+        if sensor_logger.isEnabledFor(logging.DEBUG):
+            sensor_logger.debug("Force balance looking for: s1=%s, s2=%s, s3=%s", s1_id, s2_id, s3_id)
+            sensor_logger.debug("Available sensor values: %s", list(sensor_last_values))
+            sensor_logger.debug("Raw values: s1=%s, s2=%s, s3=%s", raw_s1, raw_s2, raw_s3)
         
         # Apply tare offsets
         calibration = instance.get('calibration', {})
@@ -1546,22 +1928,16 @@ def read_force_balance(instance, config):
         s2 = raw_s2 - tare_offsets[1]
         s3 = raw_s3 - tare_offsets[2]
         
-        # Evaluate geometric formula
+        # Recompile only if the formula was edited since init
         formula = config.get('formula', '0')
-        
-        # Replace s1, s2, s3 in formula
-        eval_formula = formula.replace('s1', str(s1)).replace('s2', str(s2)).replace('s3', str(s3))
-        
-        # Replace ^ with ** for power operation
-        eval_formula = eval_formula.replace('^', '**')
-        
-        # Validate formula safety
-        if not re.match(r'^[\d\s\.\+\-\*/\(\)\*]+$', eval_formula):
-            print(f"Warning: Invalid formula: {formula}")
+        if instance.get('formula') != formula:
+            prepare_force_balance_formula(instance, formula)
+
+        if not instance['formula_valid']:
             return 0.0
-        
-        # Calculate raw result
-        raw_result = eval(eval_formula)
+
+        # Calculate raw result from the pre-validated code object
+        raw_result = eval(instance['formula_code'], {'__builtins__': {}}, {'s1': s1, 's2': s2, 's3': s3})
         
         # Apply calibration factor
         calibration_factor = calibration.get('calibration_factor', 1.0)
@@ -1570,7 +1946,7 @@ def read_force_balance(instance, config):
         return float(final_value)
         
     except Exception as e:
-        print(f"Error reading force balance: {e}")
+        sensor_logger.error(f"Error reading force balance: {e}")
         return 0.0
 
 def auto_create_udp_sensor(sensor_id, port, source_ip):
@@ -1631,10 +2007,6 @@ def auto_create_udp_sensor(sensor_id, port, source_ip):
 
 def udp_listener_thread(port):
     """Background thread to listen for UDP packets on a specific port"""
-    import socket
-    import json
-    import time
-    
     sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
     sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
     sock.settimeout(1.0)  # 1 second timeout for clean shutdown
@@ -1664,7 +2036,7 @@ def udp_listener_thread(port):
                             }
                             # Auto-create sensor configuration
                             auto_create_udp_sensor(sensor_id, port, addr[0])
-                            print(f"UDP multi-value from {addr[0]}: {sensor_id} = {value}")
+                            logger.debug(f"UDP multi-value from {addr[0]}: {sensor_id} = {value}")
                     
                     # Check for single-value format: {"id": "sensor_id", "value": 23.5}
                     elif 'id' in packet and 'value' in packet:
@@ -1680,7 +2052,7 @@ def udp_listener_thread(port):
                             }
                             # Auto-create sensor configuration
                             auto_create_udp_sensor(sensor_id, port, addr[0])
-                            print(f"UDP received from {addr[0]}: {sensor_id} = {value}")
+                            logger.debug(f"UDP received from {addr[0]}: {sensor_id} = {value}")
                         else:
                             print(f"UDP packet missing id or value: {packet}")
                     else:
@@ -1897,8 +2269,6 @@ def get_esp32_status(ip):
 def init_udp_sensor(config):
     """Initialize UDP network sensor"""
     try:
-        import threading
-        
         port = int(config.get('udp_port', 5000))
         sensor_id = config.get('sensor_id')
         timeout = int(config.get('timeout', 5))
@@ -1928,8 +2298,6 @@ def init_udp_sensor(config):
 def read_udp_sensor(instance, config):
     """Read value from UDP sensor data cache"""
     try:
-        import time
-        
         if instance is None:
             return 0.0
         
@@ -1950,7 +2318,7 @@ def read_udp_sensor(instance, config):
         return float(data['value'])
         
     except Exception as e:
-        print(f"Error reading UDP sensor: {e}")
+        sensor_logger.error(f"Error reading UDP sensor: {e}")
         return 0.0
 
 # Sensor handler registry
@@ -1975,33 +2343,104 @@ SENSOR_HANDLERS = {
 
 # Load settings from file
 def load_settings():
+    global settings_mtime_ns
     try:
         if os.path.exists(SETTINGS_FILE):
-            with open(SETTINGS_FILE, 'r') as f:
-                return json.load(f)
+            settings_mtime_ns = get_settings_mtime()
+            return read_settings_file()
     except Exception as e:
         print(f"Error loading settings: {e}")
-    return DEFAULT_SETTINGS.copy()
+    return default_settings()
+
+def read_settings_file():
+    """Parse SETTINGS_FILE, using orjson when available"""
+    if orjson is not None:
+        with open(SETTINGS_FILE, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(SETTINGS_FILE, 'r') as f:
+        return json.load(f)
+
+def write_settings_file(settings):
+    """Write settings to SETTINGS_FILE as indented JSON, using orjson when available"""
+    if orjson is not None:
+        with open(SETTINGS_FILE, 'wb') as f:
+            f.write(orjson.dumps(settings, option=orjson.OPT_INDENT_2))
+    else:
+        with open(SETTINGS_FILE, 'w') as f:
+            json.dump(settings, f, indent=2)
+
+def get_settings_mtime():
+    """Return SETTINGS_FILE modification time in ns, or None if it doesn't exist"""
+    try:
+        return os.stat(SETTINGS_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def reload_settings_if_changed():
+    """
+    Reload settings if SETTINGS_FILE was modified outside the app.
+    
+    Costs a single stat() when nothing changed, so it is safe to call every tick.
+    
+    Returns:
+        True if settings were reloaded
+    """
+    global current_settings, settings_mtime_ns
+    
+    mtime = get_settings_mtime()
+    if mtime is None or mtime == settings_mtime_ns:
+        return False
+    settings_mtime_ns = mtime
+    
+    try:
+        new_settings = read_settings_file()
+    except Exception as e:
+        # Keep running with the current settings (e.g. file is mid-edit)
+        print(f"Error reloading settings: {e}")
+        return False
+    
+    # Same follow-up as a settings POST, minus writing the file back
+    old_sensors = current_settings.get('sensors', [])
+    current_settings = new_settings
+    if release_sensor_instances(old_sensors, current_settings.get('sensors', [])):
+        save_deleted_udp_sensors()
+    refresh_pid_settings()
+    invalidate_sensor_plan()
+    api_response_cache.clear()
+    socketio.emit('settings_updated', current_settings)
+    print("Settings file changed on disk - reloaded")
+    return True
 
 # Save settings to file
 def save_settings_to_file(settings):
+    global settings_mtime_ns
     try:
-        with open(SETTINGS_FILE, 'w') as f:
-            json.dump(settings, f, indent=2)
+        write_settings_file(settings)
+        
+        # Remember our own write so the change watcher doesn't reload it
+        settings_mtime_ns = get_settings_mtime()
+        
+        # Sensor list may have changed - rebuild plan and cached responses
+        invalidate_sensor_plan()
+        api_response_cache.clear()
         
         # Also save deleted_udp_sensors to a separate file for persistence
-        try:
-            deleted_sensors_file = 'deleted_udp_sensors.json'
-            with open(deleted_sensors_file, 'w') as f:
-                json.dump(list(deleted_udp_sensors), f)
-        except Exception as e:
-            print(f"Error saving deleted UDP sensors list: {e}")
+        save_deleted_udp_sensors()
         
         return True
     except Exception as e:
         print(f"Error saving settings: {e}")
         return False
 
+def save_deleted_udp_sensors():
+    """Persist the deleted UDP sensor blacklist next to the settings."""
+    try:
+        deleted_sensors_file = 'deleted_udp_sensors.json'
+        with open(deleted_sensors_file, 'w') as f:
+            json.dump(list(deleted_udp_sensors), f)
+    except Exception as e:
+        print(f"Error saving deleted UDP sensors list: {e}")
+
 # Global settings
 current_settings = load_settings()
 
@@ -2016,34 +2455,413 @@ except Exception as e:
     print(f"Error loading deleted UDP sensors list: {e}")
     deleted_udp_sensors = set()
 
+def release_sensor_instances(old_sensors, new_sensors):
+    """
+    Clean up hardware instances of sensors that were removed or reconfigured.
+    
+    The next sensor plan build re-initializes reconfigured sensors with their
+    new config. Removed UDP sensors are blacklisted so discovery doesn't
+    recreate them.
+    
+    Returns:
+        True if a sensor was added to deleted_udp_sensors
+    """
+    new_by_id = {sensor.get('id'): sensor for sensor in new_sensors}
+    blacklisted = False
+    
+    for sensor in old_sensors:
+        sensor_id = sensor.get('id')
+        new_sensor = new_by_id.get(sensor_id)
+        
+        # Track deleted UDP sensors to prevent auto-recreation
+        if new_sensor is None and sensor.get('type') == 'udp_network':
+            deleted_udp_sensors.add(sensor_id)
+            blacklisted = True
+            print(f"Added {sensor_id} to deleted UDP sensors blacklist")
+        
+        if sensor_id not in sensor_instances:
+            continue
+        if (new_sensor is not None and new_sensor.get('type') == sensor.get('type')
+                and new_sensor.get('config') == sensor.get('config')):
+            continue  # Unchanged - keep the running instance
+        
+        handler = SENSOR_HANDLERS.get(sensor.get('type'), {})
+        if 'cleanup' in handler:
+            print(f"Cleaning up sensor: {sensor_id}")
+            handler['cleanup'](sensor_instances[sensor_id])
+        del sensor_instances[sensor_id]
+    
+    return blacklisted
+
+def refresh_pid_settings():
+    """Copy the PID fields derived from current_settings into pid_state and a running controller."""
+    if not pid_state['auto_tuning']:  # Auto-tune drives its own feedback sensor
+        pid_state['airspeed_sensor_id'] = current_settings.get('airspeed_sensor_id')
+    pid_state['min_fan_speed'] = current_settings.get('min_fan_speed', 15.0)
+    
+    controller = pid_state['controller']
+    if pid_state['enabled'] and controller:
+        controller.kp = current_settings.get('pid_kp', 5.0)
+        controller.ki = current_settings.get('pid_ki', 0.5)
+        controller.kd = current_settings.get('pid_kd', 0.1)
+        controller.min_output = current_settings.get('min_fan_speed', 15.0)
+
 # Initialize PID state from settings
-pid_state['airspeed_sensor_id'] = current_settings.get('airspeed_sensor_id')
-pid_state['min_fan_speed'] = current_settings.get('min_fan_speed', 15.0)
+refresh_pid_settings()
 
 # Add cache control headers
 @app.after_request
 def add_header(response):
     """Add headers to prevent caching of static files."""
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
+    if 'stale-while-revalidate' in response.headers.get('Cache-Control', ''):
+        # Endpoint set its own short-lived caching (/api/data)
+        return response
+    if response.get_etag()[0]:
+        # Browser may keep it but must revalidate with If-None-Match every time
+        response.headers['Cache-Control'] = 'no-cache'
+    else:
+        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
     response.headers['Pragma'] = 'no-cache'
     response.headers['Expires'] = '-1'
     return response
 
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode='threading')
+class OrjsonSocketIOJSON:
+    """
+    orjson adapter for python-socketio's `json` option. Each emit is serialized
+    once into a packet shared by all recipients, so this is the per-tick encode.
+    """
+    @staticmethod
+    def dumps(obj, **kwargs):
+        # separators etc. are ignored - orjson output is always compact
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
+
+class OrjsonJSONProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider backed by orjson, used by jsonify() in every endpoint.
+    Keys are sorted like Flask's default; dates and other types orjson doesn't
+    handle the same way go through Flask's default() hook.
+    """
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = OrjsonJSONProvider(app)
+
+socketio_options = {'json': OrjsonSocketIOJSON} if orjson is not None else {}
+socketio = SocketIO(app, cors_allowed_origins="*", async_mode=ASYNC_MODE, **socketio_options)
 
 # Thread lock for data updates
 thread_lock = Lock()
 background_thread = None
 
+# Live data broadcast - ticks are coalesced into one 'data_update' frame per interval
+UI_BATCH_INTERVAL = 0.1  # seconds - below one tick, so batching only merges bursts (adds at most 100 ms)
+ui_emit_buffer = deque(maxlen=50)  # Ticks waiting to be broadcast (oldest dropped if emitter stalls)
+TELEMETRY_ROOM = 'telemetry'  # Clients receiving live data_update frames
+DB_FLUSH_INTERVAL = 5  # Flush database writes every 5 seconds (handles bursts better)
+CLEANUP_INTERVAL = 3600  # Cleanup old data every hour
+last_tick = None  # Most recent tick from background_data_updater, shared by REST/socket requests
+last_tick_body = None  # (tick, encoded JSON) - /api/data encodes each tick at most once
+last_requested_tick = {}  # {sid: tick} last sent by request_data, so repeat requests within a tick are dropped
+
 # Update status tracking
 update_in_progress = False
 update_lock = Lock()
+# Shell that runs install.sh, resolved once (bash, falling back to sh)
+BASH_PATH = shutil.which('bash') or next(
+    (path for path in ('/bin/bash', '/usr/bin/bash', '/usr/local/bin/bash', '/bin/sh', '/usr/bin/sh')
+     if os.path.exists(path)),
+    None
+)
+ANSI_RE = re.compile(r'\x1b\[[0-9;]*m')  # Color codes in install.sh output
+# Keywords that classify an install.sh output line, checked in order (matched against lowercased line)
+UPDATE_LINE_TYPES = (
+    ('success', ('✓', 'success')),
+    ('error', ('✗', 'error', 'fail')),
+    ('warning', ('⚠', 'warning')),
+)
+
+# update_progress rate limit - output beyond this is held back and sent as one batch
+UPDATE_PROGRESS_RATE = 50  # Events per second
+UPDATE_PROGRESS_BURST = 10  # Events allowed back-to-back
+UPDATE_PROGRESS_BACKLOG = 1000  # Lines held while limited (oldest dropped beyond this)
+# install.sh output of the last update - kept in the app directory, not a shared /tmp path
+UPDATE_LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'update.log')
+UPDATE_LOG_POLL_INTERVAL = 0.1  # seconds between reads of the update log
+
+class TokenBucket:
+    """
+    Token bucket rate limiter - allows `rate` actions per second on average,
+    with bursts of up to `capacity` actions.
+    """
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last = time.monotonic()
+    
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+    
+    def try_take(self):
+        """Take a token if one is available. Returns True if the action may proceed."""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+    
+    def wait_time(self):
+        """Seconds until the next token is available"""
+        self._refill()
+        return max(0.0, (1 - self.tokens) / self.rate)
+
+def classify_update_line(line):
+    """Return the update_progress message type for a line of install.sh output"""
+    lowered = line.lower()
+    for msg_type, tokens in UPDATE_LINE_TYPES:
+        if any(token in lowered for token in tokens):
+            return msg_type
+    return 'info'
+
+
+
+# Mock value profiles by keyword in the sensor ID/name, first match wins:
+# (keywords, center, spread, whole numbers)
+MOCK_SENSOR_PROFILES = (
+    (('velocity', 'speed'), 15.5, 2, False),
+    (('lift',), 125.3, 10, False),
+    (('drag',), 45.2, 5, False),
+    (('pressure',), 101.3, 0.5, False),
+    (('temperature', 'temp'), 22.5, 1, False),
+    (('rpm', 'rotation'), 3500, 100, True),
+    (('power', 'watt'), 850, 50, False),
+    (('force',), 50.0, 5, False),
+    (('angle',), 0, 45, False),
+)
+MOCK_SENSOR_DEFAULT_PROFILE = (50, 50, False)  # Generic mock data for unknown sensor types
+
+def mock_sensor_profile(sensor_lower):
+    """Pick the (center, spread, whole numbers) mock profile for a lowercased sensor ID/name"""
+    for keywords, center, spread, whole in MOCK_SENSOR_PROFILES:
+        if any(keyword in sensor_lower for keyword in keywords):
+            return (center, spread, whole)
+    return MOCK_SENSOR_DEFAULT_PROFILE
+
+def read_mock_sensor(profile, config):
+    """Generate a plausible mock value from the profile chosen when the plan was built"""
+    center, spread, whole = profile
+    if whole:
+        return center + random.randint(-spread, spread)
+    return center + random.uniform(-spread, spread)
+
+def read_unknown_sensor(instance, config):
+    """Unknown sensor type - always 0"""
+    return 0.0
+
+def get_sensor_instance(sensor_id, sensor_type, config):
+    """Return the cached hardware instance for a sensor, initializing it on first use"""
+    if sensor_id not in sensor_instances:
+        print(f"Initializing hardware sensor: {sensor_id} ({sensor_type})")
+        sensor_instances[sensor_id] = SENSOR_HANDLERS[sensor_type]['init'](config)
+    return sensor_instances[sensor_id]
+
+def build_sensor_plan():
+    """
+    Flatten the configured sensors into the per-tick evaluation plan.
+    
+    Runs once after each settings change (from the data loop, so hardware
+    init stays off the request threads) instead of re-resolving types,
+    names and handlers for every sensor on every tick.
+    
+    Returns:
+        Tuple (base_sensors, calculated_sensors, circular_ids, force_balance_sensors):
+        - base_sensors: [(sensor_id, read, instance, config, cache_last_value)]
+        - calculated_sensors: [(sensor_id, formula, refs, code)] in dependency order,
+          refs = [(ref_id, variable_name)], code is None if the formula doesn't compile
+        - circular_ids: [sensor_id] of calculated sensors that can't be ordered
+        - force_balance_sensors: [(sensor_id, read, instance, config)]
+    """
+    sensors = current_settings.get('sensors', [])
+    if not sensors or len(sensors) == 0:
+        sensors = DEFAULT_SENSORS
+        sensor_logger.debug(f"Using DEFAULT_SENSORS: {len(sensors)} sensors")
+    
+    base_sensors = []
+    calculated_sensors = []
+    force_balance_sensors = []
+    
+    for sensor in sensors:
+        if not sensor.get('enabled', True):
+            continue
+        
+        sensor_id = sensor['id']
+        sensor_type = sensor['type']
+        config = sensor.get('config', {})
+        
+        if sensor_type == 'calculated':
+            calculated_sensors.append((sensor_id, config.get('formula', '')))
+        elif sensor_type in ['force_balance_lift', 'force_balance_drag']:
+            # Force balance sensors depend on HX711 readings - evaluated last
+            instance = get_sensor_instance(sensor_id, sensor_type, config)
+            force_balance_sensors.append((sensor_id, SENSOR_HANDLERS[sensor_type]['read'], instance, config))
+        elif sensor_type == 'mock':
+            sensor_lower = (sensor_id + sensor['name']).lower()
+            base_sensors.append((sensor_id, read_mock_sensor, mock_sensor_profile(sensor_lower), config, False))
+        elif sensor_type in SENSOR_HANDLERS:
+            instance = get_sensor_instance(sensor_id, sensor_type, config)
+            base_sensors.append((sensor_id, SENSOR_HANDLERS[sensor_type]['read'], instance, config, True))
+        else:
+            base_sensors.append((sensor_id, read_unknown_sensor, None, config, False))
+    
+    base_ids = [entry[0] for entry in base_sensors]
+    ordered_sensors, circular_ids = order_calculated_sensors(calculated_sensors, base_ids)
+    if circular_ids:
+        sensor_logger.warning(f"Circular dependency or self reference in calculated sensors: {', '.join(circular_ids)}")
+    
+    calculated_sensors = []
+    for sensor_id, formula, refs in ordered_sensors:
+        code, variables = compile_calculated_formula(sensor_id, formula, refs)
+        calculated_sensors.append((sensor_id, formula, variables, code))
+    
+    return base_sensors, calculated_sensors, circular_ids, force_balance_sensors
+
+WORD_TOKEN_RE = re.compile(r'\w+')
+
+def order_calculated_sensors(calculated_sensors, base_ids):
+    """
+    Sort calculated sensors so each formula runs after the sensors it references.
+    
+    Kahn's algorithm over references between calculated sensors; sensors
+    that are ready at the same time keep their configuration order. Sensors
+    in a cycle (including self references), or depending on one, can't be
+    ordered and are returned separately.
+    
+    Args:
+        calculated_sensors: [(sensor_id, formula)] in configuration order
+        base_ids: IDs of sensors read before any formula is evaluated
+    
+    Returns:
+        Tuple (ordered, circular_ids):
+        - ordered: [(sensor_id, formula, refs)], refs = [(ref_id, compiled_pattern)]
+        - circular_ids: [sensor_id] left over after the sort
+    """
+    formulas = dict(calculated_sensors)
+    calculated_ids = list(formulas)
+    known_ids = list(base_ids) + calculated_ids
+    patterns = {sid: re.compile(r'\b' + re.escape(sid) + r'\b') for sid in known_ids}
+    # IDs made only of word characters are found by set lookup in the formula's
+    # word tokens (same matches as the \b pattern); others need the regex search
+    word_ids = [sid for sid in known_ids if WORD_TOKEN_RE.fullmatch(sid)]
+    other_ids = [sid for sid in known_ids if not WORD_TOKEN_RE.fullmatch(sid)]
+    
+    refs = {}
+    dependents = {sid: [] for sid in calculated_ids}
+    in_degree = {}
+    for sensor_id, formula in formulas.items():
+        formula = str(formula)
+        tokens = set(WORD_TOKEN_RE.findall(formula))
+        referenced = tokens.intersection(word_ids)
+        referenced.update(sid for sid in other_ids if patterns[sid].search(formula))
+        refs[sensor_id] = [(sid, patterns[sid]) for sid in known_ids if sid in referenced]
+        calculated_deps = {sid for sid, pattern in refs[sensor_id] if sid in formulas}
+        in_degree[sensor_id] = len(calculated_deps)
+        for dep in calculated_deps:
+            dependents[dep].append(sensor_id)
+    
+    ready = deque(sid for sid in calculated_ids if in_degree[sid] == 0)
+    ordered = []
+    while ready:
+        sensor_id = ready.popleft()
+        ordered.append((sensor_id, formulas[sensor_id], refs[sensor_id]))
+        for dependent in dependents[sensor_id]:
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                ready.append(dependent)
+    
+    circular_ids = [sid for sid in calculated_ids if in_degree[sid] > 0]
+    return ordered, circular_ids
 
+def compile_calculated_formula(sensor_id, formula, refs):
+    """
+    Compile a calculated sensor formula once, with sensor IDs replaced by variables.
+    
+    Sensor IDs aren't necessarily valid Python names, so each referenced ID is
+    rewritten to a placeholder variable that is bound to the sensor's value at
+    evaluation time. The parsed formula is checked against the same AST whitelist
+    as force balance formulas (plus calls to the formula functions), and names
+    that are neither a sensor nor a formula function are reported here once
+    rather than failing with NameError on every tick.
+    
+    Returns:
+        Tuple (code, variables) - code is None if the formula can't be evaluated,
+        variables is [(ref_id, variable_name)]
+    """
+    source = str(formula)
+    variables = []
+    for index, (ref_id, pattern) in enumerate(refs):
+        name = f"_v{index}"
+        source = pattern.sub(name, source)
+        variables.append((ref_id, name))
+    
+    try:
+        tree = ast.parse(source.replace('^', '**'), mode='eval')
+    except (SyntaxError, ValueError) as e:
+        sensor_logger.warning(f"Invalid formula for calculated sensor {sensor_id}: {e}")
+        return None, variables
+    
+    for node in ast.walk(tree):
+        if not isinstance(node, CALCULATED_FORMULA_ALLOWED_NODES):
+            error = f"unsupported element '{type(node).__name__}'"
+        elif isinstance(node, ast.Constant) and type(node.value) not in (int, float):
+            error = f"unsupported constant {node.value!r}"
+        elif isinstance(node, ast.Call) and not (
+                isinstance(node.func, ast.Name) and callable(CALCULATED_FORMULA_GLOBALS.get(node.func.id))):
+            error = "only formula functions can be called"
+        else:
+            continue
+        sensor_logger.warning(f"Invalid formula for calculated sensor {sensor_id}: {error}")
+        return None, variables
+    
+    known_names = {name for ref_id, name in variables}
+    unknown_names = sorted(
+        {node.id for node in ast.walk(tree) if isinstance(node, ast.Name)}
+        - known_names - CALCULATED_FORMULA_GLOBALS.keys()
+    )
+    if unknown_names:
+        sensor_logger.warning(f"Calculated sensor {sensor_id} references unknown sensor(s): {', '.join(unknown_names)}")
+        return None, variables
+    
+    return compile(tree, f"<sensor {sensor_id}>", 'eval'), variables
 
+def invalidate_sensor_plan():
+    """Force the sensor plan to be rebuilt on the next tick"""
+    global sensor_plan
+    sensor_plan = None
+    calculated_results.clear()
 
 def generate_mock_data():
+    """Read all configured sensors and return one tick dict including its 'timestamp'."""
+    timestamp, data = read_sensor_values()
+    data['timestamp'] = timestamp
+    return data
+
+def read_sensor_values():
     """
     Generate mock sensor data in SI units based on configured sensors.
+    Returns (timestamp, {sensor_id: value}) - the dict never holds 'timestamp'.
     
     ALL DATA IS STORED AND TRANSMITTED IN SI UNITS:
     - velocity: meters per second (m/s)
@@ -2058,377 +2876,161 @@ def generate_mock_data():
     Unit conversions are handled client-side for display only.
     Data logging, calculations, and storage always use SI units.
     """
-    sensors = current_settings.get('sensors', [])
-    if not sensors or len(sensors) == 0:
-        sensors = DEFAULT_SENSORS
-        print(f"Using DEFAULT_SENSORS: {len(sensors)} sensors")
+    global sensor_plan
+    if sensor_plan is None:
+        sensor_plan = build_sensor_plan()
+    base_sensors, calculated_plan, circular_ids, force_balance_plan = sensor_plan
     
-    data = {'timestamp': time.time()}
-    sensor_values = {}
+    # Sensor values only - the timestamp is kept out so it never takes part
+    # in formula dependency resolution or gets logged as a sensor
+    timestamp = time.time()
+    data = {}
     
-    # First pass: Generate data for base sensors (hardware and mock)
-    for sensor in sensors:
-        if not sensor.get('enabled', True):
+    # First pass: Read base sensors (hardware and mock)
+    for sensor_id, read, instance, config, cache in base_sensors:
+        value = read(instance, config)
+        if cache:
+            sensor_last_values[sensor_id] = value  # Cache for status checks
+        data[sensor_id] = value
+    
+    # Calculated sensors - the plan is already in dependency order, so a
+    # single pass resolves everything; circular references always read 0
+    for sensor_id in circular_ids:
+        data[sensor_id] = 0
+    
+    for sensor_id, formula, refs, code in calculated_plan:
+        # Inputs unchanged since the last evaluation (slow hardware) - reuse the result
+        inputs = tuple((sid, data[sid]) for sid, name in refs)
+        cached = calculated_results.get(sensor_id)
+        if cached is not None and cached[0] == formula and cached[1] == inputs:
+            data[sensor_id] = cached[2]
+            sensor_last_values[sensor_id] = cached[2]
             continue
-            
-        sensor_id = sensor['id']
-        sensor_type = sensor['type']
         
-        # Skip calculated and force_balance sensors in first pass
-        if sensor_type in ['calculated', 'force_balance_lift', 'force_balance_drag']:
+        if code is None:
+            data[sensor_id] = None  # Formula failed to compile
             continue
         
-        print(f"Processing sensor: {sensor_id}, type: {sensor_type}, name: {sensor['name']}")
-        
-        if sensor_type == 'mock':
-            # Generate random mock data
-            # Try to generate sensible defaults based on sensor ID/name, otherwise random
-            sensor_lower = (sensor_id + sensor['name']).lower()
-            
-            if 'velocity' in sensor_lower or 'speed' in sensor_lower:
-                value = 15.5 + random.uniform(-2, 2)
-            elif 'lift' in sensor_lower:
-                value = 125.3 + random.uniform(-10, 10)
-            elif 'drag' in sensor_lower:
-                value = 45.2 + random.uniform(-5, 5)
-            elif 'pressure' in sensor_lower:
-                value = 101.3 + random.uniform(-0.5, 0.5)
-            elif 'temperature' in sensor_lower or 'temp' in sensor_lower:
-                value = 22.5 + random.uniform(-1, 1)
-            elif 'rpm' in sensor_lower or 'rotation' in sensor_lower:
-                value = 3500 + random.randint(-100, 100)
-            elif 'power' in sensor_lower or 'watt' in sensor_lower:
-                value = 850 + random.uniform(-50, 50)
-            elif 'force' in sensor_lower:
-                value = 50.0 + random.uniform(-5, 5)
-            elif 'angle' in sensor_lower:
-                value = random.uniform(-45, 45)
-            else:
-                # Generic mock data for unknown sensor types
-                value = random.uniform(0, 100)
-            
-            sensor_values[sensor_id] = value
-            data[sensor_id] = value
-            
-        elif sensor_type == 'calculated':
-            # Handle calculated values (will be computed after all sensors)
-            pass
-        elif sensor_type in SENSOR_HANDLERS:
-            # Hardware sensor - initialize if needed and read value
-            if sensor_id not in sensor_instances:
-                print(f"Initializing hardware sensor: {sensor_id} ({sensor_type})")
-                handler = SENSOR_HANDLERS[sensor_type]
-                instance = handler['init'](sensor.get('config', {}))
-                sensor_instances[sensor_id] = instance
-            
-            # Read value from sensor
-            if sensor_id in sensor_instances:
-                handler = SENSOR_HANDLERS[sensor_type]
-                value = handler['read'](sensor_instances[sensor_id], sensor.get('config', {}))
-                sensor_values[sensor_id] = value
-                sensor_last_values[sensor_id] = value  # Cache for status checks
-                data[sensor_id] = value
-            else:
-                # Failed to initialize
-                value = 0.0
-                sensor_values[sensor_id] = value
-                data[sensor_id] = value
-        else:
-            # Unknown sensor type - return 0
-            value = 0.0
-            sensor_values[sensor_id] = value
-            data[sensor_id] = value
-    
-    # Calculate derived values with dependency resolution
-    # Build dependency graph for calculated sensors
-    calculated_sensors = [s for s in sensors if s.get('enabled', True) and s['type'] == 'calculated']
-    
-    # Topological sort to handle dependencies
-    evaluated = set()
-    max_iterations = len(calculated_sensors) + 1
-    iteration = 0
-    
-    while calculated_sensors and iteration < max_iterations:
-        iteration += 1
-        made_progress = False
-        
-        for sensor in calculated_sensors[:]:  # Copy list to modify during iteration
-            formula = sensor.get('config', {}).get('formula', '')
-            sensor_id = sensor['id']
-            
-            # Extract referenced sensor IDs from formula
-            referenced_ids = set()
-            for sid in sensor_values.keys():
-                if re.search(r'\b' + re.escape(sid) + r'\b', formula):
-                    referenced_ids.add(sid)
+        try:
+            # Bind referenced sensor values and evaluate the precompiled formula
+            namespace = {name: data[sid] for sid, name in refs}
+            result = eval(code, CALCULATED_FORMULA_GLOBALS, namespace)
             
-            # Check if sensor references itself
-            if re.search(r'\b' + re.escape(sensor_id) + r'\b', formula):
-                print(f"Warning: Circular reference detected in sensor {sensor_id}")
+            # Check for invalid results
+            if result is None or (isinstance(result, float) and (result != result or abs(result) == float('inf'))):
+                sensor_logger.debug("Invalid result for sensor %s: %s", sensor_id, result)
                 data[sensor_id] = 0
-                calculated_sensors.remove(sensor)
-                made_progress = True
-                continue
+            else:
+                data[sensor_id] = float(result)  # Also makes it available for other calculated sensors
+                sensor_last_values[sensor_id] = float(result)  # Cache for PID and other uses
+                calculated_results[sensor_id] = (formula, inputs, float(result))
             
-            # Check if all dependencies are satisfied
-            if referenced_ids.issubset(sensor_values.keys()):
-                try:
-                    # Replace sensor IDs with their values
-                    eval_formula = formula
-                    for sid, val in sensor_values.items():
-                        eval_formula = re.sub(r'\b' + re.escape(sid) + r'\b', str(val), eval_formula)
-                    
-                    # Replace ^ with ** for power operation
-                    eval_formula = eval_formula.replace('^', '**')
-                    
-                    # Create safe math context with common functions
-                    safe_math = {
-                        'sqrt': lambda x: math.sqrt(max(0, x)),  # Prevent negative sqrt
-                        'pow': math.pow,
-                        'abs': abs,
-                        'max': max,
-                        'min': min,
-                        'sin': math.sin,
-                        'cos': math.cos,
-                        'tan': math.tan,
-                        'log': math.log,
-                        'log10': math.log10,
-                        'exp': math.exp,
-                        'pi': math.pi,
-                        'e': math.e,
-                        '__builtins__': {}  # Restrict access to built-in functions
-                    }
-                    
-                    # Evaluate formula with safe math functions
-                    result = eval(eval_formula, safe_math)
-                    
-                    # Check for invalid results
-                    if result is None or (isinstance(result, float) and (result != result or abs(result) == float('inf'))):
-                        print(f"Warning: Invalid result for sensor {sensor_id}: {result}")
-                        data[sensor_id] = 0
-                    else:
-                        data[sensor_id] = float(result)
-                        sensor_values[sensor_id] = float(result)  # Make available for other calculated sensors
-                        sensor_last_values[sensor_id] = float(result)  # Cache for PID and other uses
-                    
-                    calculated_sensors.remove(sensor)
-                    evaluated.add(sensor_id)
-                    made_progress = True
-                    
-                except ZeroDivisionError:
-                    print(f"Warning: Division by zero in sensor {sensor_id}")
-                    data[sensor_id] = 0
-                    calculated_sensors.remove(sensor)
-                    made_progress = True
-                except (ValueError, SyntaxError, NameError) as e:
-                    print(f"Warning: Error evaluating formula for sensor {sensor_id}: {e}")
-                    data[sensor_id] = None  # Set to None instead of 0
-                    sensor_values[sensor_id] = None
-                    calculated_sensors.remove(sensor)
-                    made_progress = True
-                except Exception as e:
-                    print(f"Warning: Unexpected error for sensor {sensor_id}: {e}")
-                    data[sensor_id] = None  # Set to None instead of 0
-                    sensor_values[sensor_id] = None
-                    calculated_sensors.remove(sensor)
-                    made_progress = True
-        
-        # If no progress was made, we have circular dependencies
-        if not made_progress:
-            for sensor in calculated_sensors:
-                print(f"Warning: Circular dependency or missing reference for sensor {sensor['id']}")
-                data[sensor['id']] = 0
-            break
+        except ZeroDivisionError:
+            sensor_logger.debug("Division by zero in sensor %s", sensor_id)
+            data[sensor_id] = 0
+        except (ValueError, NameError) as e:
+            sensor_logger.debug("Error evaluating formula for sensor %s: %s", sensor_id, e)
+            data[sensor_id] = None  # Set to None instead of 0
+        except Exception as e:
+            sensor_logger.debug("Unexpected error for sensor %s: %s", sensor_id, e)
+            data[sensor_id] = None  # Set to None instead of 0
     
     # Second pass: Process force balance sensors (depend on HX711 readings)
-    force_balance_sensors = [s for s in sensors if s.get('enabled', True) and s['type'] in ['force_balance_lift', 'force_balance_drag']]
-    
-    for sensor in force_balance_sensors:
-        sensor_id = sensor['id']
-        sensor_type = sensor['type']
-        
-        print(f"Processing force balance sensor: {sensor_id} ({sensor_type})")
-        
-        # Initialize if needed
-        if sensor_id not in sensor_instances:
-            print(f"Initializing force balance sensor: {sensor_id}")
-            handler = SENSOR_HANDLERS[sensor_type]
-            instance = handler['init'](sensor.get('config', {}))
-            sensor_instances[sensor_id] = instance
-        
-        # Read value
-        if sensor_id in sensor_instances and sensor_instances[sensor_id] is not None:
-            handler = SENSOR_HANDLERS[sensor_type]
-            value = handler['read'](sensor_instances[sensor_id], sensor.get('config', {}))
-            sensor_values[sensor_id] = value
+    for sensor_id, read, instance, config in force_balance_plan:
+        if instance is not None:
+            value = read(instance, config)
             sensor_last_values[sensor_id] = value
             data[sensor_id] = value
         else:
             # Failed to initialize
             data[sensor_id] = 0.0
     
-    return data
+    return timestamp, data
+
+def _iter_file_sizes(directory):
+    """Yield the size of every file below directory (one stat per file, symlinks not followed)."""
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        yield from _iter_file_sizes(entry.path)
+                    else:
+                        yield entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    # File removed while scanning
+                    continue
+    except OSError:
+        return
 
 def get_directory_size_mb(directory):
     """Calculate total size of directory in MB."""
-    total_size = 0
-    for dirpath, dirnames, filenames in os.walk(directory):
-        for filename in filenames:
-            filepath = os.path.join(dirpath, filename)
-            if os.path.exists(filepath):
-                total_size += os.path.getsize(filepath)
-    return total_size / (1024 * 1024)
-
-# CSV LOGGING FUNCTIONS - DISABLED (using SQLite database instead)
-# def cleanup_old_logs():
-#     """
-#     Remove old log files to prevent disk space issues.
-#     Deletes oldest files first when limits are exceeded.
-#     """
-#     try:
-#         if not os.path.exists(DATA_LOG_DIR):
-#             return
-#         
-#         # Get all log files with their modification times
-#         log_files = []
-#         for filename in os.listdir(DATA_LOG_DIR):
-#             if filename.endswith('.csv'):
-#                 filepath = os.path.join(DATA_LOG_DIR, filename)
-#                 if filepath != current_log_file:  # Don't delete current log
-#                     log_files.append({
-#                         'path': filepath,
-#                         'size': os.path.getsize(filepath),
-#                         'mtime': os.path.getmtime(filepath)
-#                     })
-#         
-#         # Sort by modification time (oldest first)
-#         log_files.sort(key=lambda x: x['mtime'])
-#         
-#         # Check if we exceed file count limit
-#         while len(log_files) >= MAX_LOG_FILES:
-#             oldest = log_files.pop(0)
-#             print(f"Deleting old log file (file count limit): {os.path.basename(oldest['path'])}")
-#             os.remove(oldest['path'])
-#         
-#         # Check if we exceed total size limit
-#         total_size_mb = sum(f['size'] for f in log_files) / (1024 * 1024)
-#         if current_log_file:
-#             total_size_mb += os.path.getsize(current_log_file) / (1024 * 1024)
-#         
-#         while total_size_mb > MAX_TOTAL_LOG_SIZE_MB and log_files:
-#             oldest = log_files.pop(0)
-#             file_size_mb = oldest['size'] / (1024 * 1024)
-#             print(f"Deleting old log file (size limit): {os.path.basename(oldest['path'])} ({file_size_mb:.2f} MB)")
-#             os.remove(oldest['path'])
-#             total_size_mb -= file_size_mb
-#         
-#         print(f"Log cleanup complete. Total log size: {total_size_mb:.2f} MB, File count: {len(log_files) + (1 if current_log_file else 0)}")
-#     
-#     except Exception as e:
-#         print(f"Error during log cleanup: {e}")
-
-# def rotate_log_file():
-#     """
-#     Rotate to a new log file.
-#     Called when current file exceeds size limit.
-#     """
-#     global current_log_file, log_session_start, log_rows_written
-#     
-#     print(f"Rotating log file (size limit reached)...")
-#     
-#     # Close current log (already closed in append mode)
-#     old_file = current_log_file
-#     
-#     # Create new log file
-#     log_session_start = datetime.now()
-#     filename = f"windtunnel_{log_session_start.strftime('%Y%m%d_%H%M%S')}.csv"
-#     current_log_file = os.path.join(DATA_LOG_DIR, filename)
-#     log_rows_written = 0
-#     
-#     # Write header
-#     sensors = current_settings.get('sensors', [])
-#     if not sensors or len(sensors) == 0:
-#         sensors = DEFAULT_SENSORS
-#     headers = ['timestamp', 'datetime'] + [s['id'] for s in sensors if s.get('enabled', True)]
-#     
-#     with open(current_log_file, 'w', newline='') as f:
-#         writer = csv.writer(f)
-#         writer.writerow(headers)
-#     
-#     print(f"Rotated to new log file: {current_log_file}")
-#     
-#     # Cleanup old logs
-#     cleanup_old_logs()
-
-# def log_data_to_csv(data):
-#     """
-#     Log data to CSV file if logging is enabled.
-#     Automatically rotates files when size limit is reached.
-#     All data logged in SI units.
-#     """
-#     global current_log_file, log_session_start, log_rows_written
-#     
-#     if not current_settings.get('dataLogging', False):
-#         return
-#     
-#     # Create new log file if needed
-#     if current_log_file is None:
-#         log_session_start = datetime.now()
-#         filename = f"windtunnel_{log_session_start.strftime('%Y%m%d_%H%M%S')}.csv"
-#         current_log_file = os.path.join(DATA_LOG_DIR, filename)
-#         log_rows_written = 0
-#         
-#         # Write header
-#         sensors = current_settings.get('sensors', [])
-#         if not sensors or len(sensors) == 0:
-#             sensors = DEFAULT_SENSORS
-#         headers = ['timestamp', 'datetime'] + [s['id'] for s in sensors if s.get('enabled', True)]
-#         
-#         with open(current_log_file, 'w', newline='') as f:
-#             writer = csv.writer(f)
-#             writer.writerow(headers)
-#         
-#         print(f"Started logging to {current_log_file}")
-#         
-#         # Run cleanup on startup
-#         cleanup_old_logs()
-#     
-#     # Check if file size exceeds limit (check every 100 rows for performance)
-#     if log_rows_written % 100 == 0 and os.path.exists(current_log_file):
-#         file_size_mb = os.path.getsize(current_log_file) / (1024 * 1024)
-#         if file_size_mb > MAX_LOG_FILE_SIZE_MB:
-#             rotate_log_file()
-#     
-#     # Append data
-#     try:
-#         sensors = current_settings.get('sensors', [])
-#         if not sensors or len(sensors) == 0:
-#             sensors = DEFAULT_SENSORS
-#         enabled_sensor_ids = [s['id'] for s in sensors if s.get('enabled', True)]
-#         
-#         row = [
-#             data.get('timestamp', time.time()),
-#             datetime.fromtimestamp(data.get('timestamp', time.time())).isoformat()
-#         ]
-#         row.extend([data.get(sid, '') for sid in enabled_sensor_ids])
-#         
-#         with open(current_log_file, 'a', newline='') as f:
-#             writer = csv.writer(f)
-#             writer.writerow(row)
-#         
-#         log_rows_written += 1
-#     except Exception as e:
-#         print(f"Error logging data: {e}")
-
-# def stop_logging():
-#     """Stop current logging session."""
-#     global current_log_file, log_session_start, log_rows_written
-#     if current_log_file:
-#         print(f"Stopped logging to {current_log_file} ({log_rows_written} rows written)")
-#     current_log_file = None
-#     log_session_start = None
-#     log_rows_written = 0
-# END CSV LOGGING FUNCTIONS
+    return sum(_iter_file_sizes(directory)) / (1024 * 1024)
+
+def db_maintenance_scheduler():
+    """
+    Background task for periodic database work, kept out of the sensor loop.
+    Flushes queued writes every DB_FLUSH_INTERVAL and removes old data every
+    CLEANUP_INTERVAL; when both are due the flush runs first.
+    """
+    scheduler = sched.scheduler(time.monotonic, socketio.sleep)
+    
+    def schedule_every(interval, priority, action):
+        def run():
+            try:
+                action()
+            except Exception as e:
+                logger.error(f"Error in scheduled {action.__name__}: {e}")
+            scheduler.enter(interval, priority, run)
+        scheduler.enter(interval, priority, run)
+    
+    schedule_every(DB_FLUSH_INTERVAL, 1, flush_db_write_queue)
+    schedule_every(CLEANUP_INTERVAL, 2, cleanup_old_data)
+    scheduler.run()
+
+def current_tick():
+    """Latest sensor data - reuses the background loop's tick instead of reading sensors again"""
+    tick = last_tick
+    if tick is None:
+        # Background loop hasn't produced a tick yet
+        tick = generate_mock_data()
+    return tick
+
+def ui_batch_emitter():
+    """
+    Background task that broadcasts queued ticks to all connected clients.
+    
+    Every UI_BATCH_INTERVAL all buffered ticks are sent as a single
+    'data_update' frame, so the payload is encoded once per batch and shared
+    by every client. Ticks with the same sensors are sent column-keyed as
+    {'count': n, 'keys': [sensor_id, ...], 'rows': [[value, ...], ...]} so the
+    key names go over the wire once per frame; if the sensor set changed
+    within the batch the frame is {'count': n, 'items': [tick, ...]}. A single
+    buffered tick is sent as the plain tick dict, same as a 'request_data' reply.
+    """
+    while True:
+        socketio.sleep(UI_BATCH_INTERVAL)
+        
+        items = []
+        while ui_emit_buffer:
+            items.append(ui_emit_buffer.popleft())
+        
+        if not items:
+            continue
+        if len(items) == 1:
+            payload = items[0]
+        else:
+            keys = list(items[0])
+            if all(item.keys() == items[0].keys() for item in items):
+                payload = {'count': len(items), 'keys': keys,
+                           'rows': [[item[key] for key in keys] for item in items]}
+            else:
+                payload = {'count': len(items), 'items': items}
+        
+        try:
+            socketio.emit('data_update', payload, to=TELEMETRY_ROOM, namespace='/')
+        except Exception as e:
+            logger.error(f"Error broadcasting data update: {e}")
 
 def background_data_updater():
     """
@@ -2437,42 +3039,38 @@ def background_data_updater():
     All data transmitted in SI units.
     
     Note: Database stores full resolution from all sensors (up to 200Hz from UDP).
-    UI receives decimated updates at 10Hz for smooth performance.
+    UI receives every tick, batched into frames by ui_batch_emitter().
     """
-    global current_log_file
+    global last_tick
     
-    last_db_flush = time.time()
-    last_cleanup = time.time()
-    last_ui_update = time.time()
-    DB_FLUSH_INTERVAL = 5  # Flush database writes every 5 seconds (handles bursts better)
-    CLEANUP_INTERVAL = 3600  # Cleanup old data every hour
-    UI_UPDATE_INTERVAL = 0.1  # Send to UI at 10Hz (100ms)
+    # Ticks are scheduled on a fixed grid so processing time doesn't add up as drift
+    period = UPDATE_INTERVAL_MS / 1000
+    next_tick = time.monotonic()
     
     while True:
-        data = generate_mock_data()
-        timestamp = data.get('timestamp', time.time())
+        # Pick up settings edited directly on disk (one stat() per tick)
+        reload_settings_if_changed()
+        
+        timestamp, data = read_sensor_values()
         
         # Write to database (queued for batch processing) - always
         write_sensor_data_to_db(timestamp, data)
         
-        # Send to connected clients via WebSocket - decimated to 10Hz
-        current_time = time.time()
-        if current_time - last_ui_update >= UI_UPDATE_INTERVAL:
-            socketio.emit('data_update', data)
-            last_ui_update = current_time
-        
-        # Periodically flush database writes
-        if current_time - last_db_flush >= DB_FLUSH_INTERVAL:
-            flush_db_write_queue()
-            last_db_flush = current_time
+        data['timestamp'] = timestamp
+        last_tick = data
         
-        # Periodically cleanup old data
-        if current_time - last_cleanup >= CLEANUP_INTERVAL:
-            cleanup_old_data()
-            last_cleanup = current_time
+        # Queue for connected clients - sent in batches by ui_batch_emitter()
+        ui_emit_buffer.append(data)
         
         # Fixed update interval (200ms = 5Hz for hardware sensors)
-        time.sleep(UPDATE_INTERVAL_MS / 1000)
+        next_tick += period
+        delay = next_tick - time.monotonic()
+        if delay < -period:
+            # Fell more than a tick behind (slow sensor, suspend) - restart the grid
+            # instead of firing a burst of catch-up ticks
+            next_tick = time.monotonic()
+            delay = 0
+        socketio.sleep(max(0, delay))
 
 @app.route('/')
 def index():
@@ -2496,9 +3094,35 @@ def esp32_code():
     except Exception as e:
         return f"Error loading ESP32 code: {str(e)}", 500
 
+def cached_json_response(key, build):
+    """
+    Serve a JSON payload that only changes with settings or library availability.
+    
+    build() is serialized once and reused until api_response_cache is cleared.
+    Requests with a matching If-None-Match get 304 Not Modified.
+    """
+    entry = api_response_cache.get(key)
+    if entry is None:
+        payload = build()
+        if orjson is not None:
+            body = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)
+        else:
+            body = json.dumps(payload, sort_keys=True).encode('utf-8')
+        entry = (body, hashlib.sha1(body).hexdigest())
+        api_response_cache[key] = entry
+    
+    body, etag = entry
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    return response.make_conditional(request)
+
 @app.route('/api/sensor-types', methods=['GET'])
 def get_sensor_types():
     """Get available sensor types and their configuration requirements."""
+    return cached_json_response('sensor-types', build_sensor_types)
+
+def build_sensor_types():
+    """Sensor types with availability for the current mode and installed libraries"""
     # Add availability information to sensor types
     sensor_types_with_availability = {}
     developer_mode = current_settings.get('developerMode', False)
@@ -2519,18 +3143,19 @@ def get_sensor_types():
             # Calculated sensors always available
             sensor_types_with_availability[type_id]['available'] = True
     
-    return jsonify(sensor_types_with_availability)
+    return sensor_types_with_availability
 
 @app.route('/api/sensors', methods=['GET'])
 def get_sensors():
     """Get configured sensors."""
     sensors = current_settings.get('sensors', [])
     if not sensors or len(sensors) == 0:
-        sensors = DEFAULT_SENSORS
-        # Also update current_settings to use defaults
-        current_settings['sensors'] = DEFAULT_SENSORS
+        # Also update current_settings to use defaults (a copy - UDP discovery
+        # appends to this list and must not grow the DEFAULT_SENSORS template)
+        sensors = copy.deepcopy(DEFAULT_SENSORS)
+        current_settings['sensors'] = sensors
         save_settings_to_file(current_settings)
-    return jsonify(sensors)
+    return cached_json_response('sensors', lambda: sensors)
 
 @app.route('/api/gpio/available-pins', methods=['GET'])
 def get_available_pins():
@@ -2545,7 +3170,6 @@ def get_available_pins():
     - current_sensor_id: ID of sensor being edited (to exclude its own pins)
     - pin_field: Specific field being selected (e.g., 'dout_pin', 'pd_sck_pin')
     """
-    from flask import request
     
     sensor_type = request.args.get('sensor_type')
     current_sensor_id = request.args.get('current_sensor_id')
@@ -2708,6 +3332,14 @@ def get_available_pins():
         'note': 'I2C and SPI pins can be shared between multiple sensors. GPIO pins require exclusive access.'
     })
 
+HISTORICAL_STREAM_BATCH = 5000  # Rows encoded per chunk of the streamed /api/historical-data body
+
+def encode_json_rows(rows):
+    """Encode a list of row tuples as comma-separated JSON arrays (no enclosing brackets)"""
+    if orjson is not None:
+        return orjson.dumps(rows)[1:-1]
+    return json.dumps(rows, separators=(',', ':'))[1:-1].encode('utf-8')
+
 @app.route('/api/historical-data', methods=['GET'])
 def get_historical_data():
     """
@@ -2717,8 +3349,10 @@ def get_historical_data():
     - start_time: Unix timestamp for start (optional, default: 24 hours ago)
     - end_time: Unix timestamp for end (optional, default: now)
     - max_points: Maximum number of points to return (optional, default: 100000)
+    
+    Points are returned as [timestamp, value] pairs, streamed from the
+    database cursor in chunks instead of being built up in memory first.
     """
-    from flask import request
     
     try:
         sensor_id = request.args.get('sensor')
@@ -2728,48 +3362,70 @@ def get_historical_data():
         # Default to last 24 hours if not specified
         end_time = float(request.args.get('end_time', time.time()))
         start_time = float(request.args.get('start_time', end_time - 86400))
-        max_points = int(request.args.get('max_points', 100000))
-        
-        # Query database
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        max_points = max(1, int(request.args.get('max_points', 100000)))
+        
+        with db_read_connection() as conn:
+            # Buffer info and the number of points in the window from one index scan
+            buffer_start, buffer_end, total_points, range_count = conn.execute('''
+                SELECT MIN(timestamp), MAX(timestamp), COUNT(*),
+                       COALESCE(SUM(timestamp BETWEEN ? AND ?), 0)
+                FROM sensor_data
+                WHERE sensor_id = (SELECT id FROM sensor_names WHERE name = ?)
+            ''', (start_time, end_time, sensor_id)).fetchone()
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+    
+    if range_count <= max_points:
+        query = '''
             SELECT timestamp, value 
             FROM sensor_data 
-            WHERE sensor_id = ? AND timestamp BETWEEN ? AND ?
+            WHERE sensor_id = (SELECT id FROM sensor_names WHERE name = ?) AND timestamp BETWEEN ? AND ?
             ORDER BY timestamp ASC
-        ''', (sensor_id, start_time, end_time))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Convert to list of dicts
-        data = [{'timestamp': row[0], 'value': row[1]} for row in rows]
-        
-        # Downsample if too many points
-        if len(data) > max_points:
-            step = len(data) // max_points
-            data = data[::step]
-        
-        # Get buffer info
-        conn = sqlite3.connect(DB_FILE)
-        cursor = conn.cursor()
-        cursor.execute('SELECT MIN(timestamp), MAX(timestamp), COUNT(*) FROM sensor_data WHERE sensor_id = ?', (sensor_id,))
-        buffer_info = cursor.fetchone()
-        conn.close()
-        
-        return jsonify({
-            'status': 'success',
-            'sensor': sensor_id,
-            'data': data,
-            'buffer_start': buffer_info[0] if buffer_info[0] else None,
-            'buffer_end': buffer_info[1] if buffer_info[1] else None,
-            'total_points': buffer_info[2] if buffer_info[2] else 0,
-            'returned_points': len(data)
-        })
-    except Exception as e:
-        return jsonify({'status': 'error', 'message': str(e)}), 500
+        '''
+        params = (sensor_id, start_time, end_time)
+    else:
+        # Too many points - average into time buckets in SQL
+        # (no finer than one bucket per update interval)
+        buckets = max(1, min(max_points, int((end_time - start_time) * 1000 / UPDATE_INTERVAL_MS)))
+        time_range = (end_time - start_time) or 1.0
+        query = '''
+            SELECT MIN(timestamp), AVG(value)
+            FROM sensor_data
+            WHERE sensor_id = (SELECT id FROM sensor_names WHERE name = ?) AND timestamp BETWEEN ? AND ?
+            GROUP BY MIN(CAST((timestamp - ?) * ? / ? AS INTEGER), ? - 1)
+            ORDER BY 1 ASC
+        '''
+        params = (sensor_id, start_time, end_time, start_time, buckets, time_range, buckets)
+    
+    header = {
+        'status': 'success',
+        'sensor': sensor_id,
+        'buffer_start': buffer_start if buffer_start else None,
+        'buffer_end': buffer_end if buffer_end else None,
+        'total_points': total_points if total_points else 0,
+    }
+    
+    def generate():
+        # Summary fields first, then the points array, then the count once known
+        head = orjson.dumps(header) if orjson is not None else json.dumps(header).encode('utf-8')
+        yield head[:-1] + b',"points":['
+        returned_points = 0
+        with db_read_connection() as conn:
+            cursor = conn.execute(query, params)
+            try:
+                while True:
+                    rows = cursor.fetchmany(HISTORICAL_STREAM_BATCH)
+                    if not rows:
+                        break
+                    chunk = encode_json_rows(rows)
+                    yield chunk if returned_points == 0 else b',' + chunk
+                    returned_points += len(rows)
+            finally:
+                # Ends the read transaction even if the client disconnects mid-stream
+                cursor.close()
+        yield b'],"returned_points":%d}' % returned_points
+    
+    return Response(generate(), mimetype='application/json')
 
 @app.route('/api/settings', methods=['GET'])
 def get_settings():
@@ -2779,7 +3435,6 @@ def get_settings():
 @app.route('/api/settings', methods=['POST'])
 def update_settings():
     """Update settings."""
-    from flask import request
     global current_settings, sensor_instances, deleted_udp_sensors
     
     try:
@@ -2787,35 +3442,6 @@ def update_settings():
         
         # Validate and update settings
         if new_settings:
-            # Check if sensors changed - if so, cleanup old hardware sensors
-            if 'sensors' in new_settings:
-                old_sensor_ids = {s.get('id') for s in current_settings.get('sensors', [])}
-                new_sensor_ids = {s.get('id') for s in new_settings.get('sensors', [])}
-                removed_sensors = old_sensor_ids - new_sensor_ids
-                
-                # Track deleted UDP sensors to prevent auto-recreation
-                for sensor_id in removed_sensors:
-                    for sensor in current_settings.get('sensors', []):
-                        if sensor.get('id') == sensor_id and sensor.get('type') == 'udp_network':
-                            deleted_udp_sensors.add(sensor_id)
-                            print(f"Added {sensor_id} to deleted UDP sensors blacklist")
-                            break
-                
-                # Cleanup removed sensors
-                for sensor_id in removed_sensors:
-                    if sensor_id in sensor_instances:
-                        # Find sensor type
-                        for sensor in current_settings.get('sensors', []):
-                            if sensor.get('id') == sensor_id:
-                                sensor_type = sensor.get('type')
-                                if sensor_type in SENSOR_HANDLERS:
-                                    handler = SENSOR_HANDLERS[sensor_type]
-                                    if 'cleanup' in handler:
-                                        print(f"Cleaning up sensor: {sensor_id}")
-                                        handler['cleanup'](sensor_instances[sensor_id])
-                                break
-                        del sensor_instances[sensor_id]
-            
             # Ensure updateInterval is always 500ms (ignore any client changes)
             new_settings['updateInterval'] = UPDATE_INTERVAL_MS
             
@@ -2823,8 +3449,12 @@ def update_settings():
             if 'decimalPlaces' in new_settings:
                 new_settings['decimalPlaces'] = max(0, min(5, int(new_settings['decimalPlaces'])))
             
-            # Update current settings
+            # Update current settings, then release hardware of removed or
+            # reconfigured sensors and pick up PID limits
+            old_sensors = current_settings.get('sensors', [])
             current_settings.update(new_settings)
+            release_sensor_instances(old_sensors, current_settings.get('sensors', []))
+            refresh_pid_settings()
             
             # Save to file
             if save_settings_to_file(current_settings):
@@ -2842,11 +3472,19 @@ def update_settings():
 def clear_logs():
     """Clear all sensor data from database."""
     try:
-        conn = sqlite3.connect(DB_FILE)
+        conn = open_db_connection()
         cursor = conn.cursor()
         cursor.execute('DELETE FROM sensor_data')
         deleted_rows = cursor.rowcount
         conn.commit()
+        
+        # Compact the now empty file - also switches databases created before
+        # incremental auto-vacuum over to it
+        try:
+            cursor.execute('PRAGMA auto_vacuum=INCREMENTAL')
+            cursor.execute('VACUUM')
+        except sqlite3.Error as e:
+            logger.warning(f"Could not vacuum database after clearing: {e}")
         conn.close()
         
         print(f"Cleared {deleted_rows} sensor data rows from database")
@@ -2866,10 +3504,6 @@ def clear_logs():
 def wifi_status():
     """Get current WiFi connection status and signal strength."""
     try:
-        import subprocess
-        import re
-        import os
-        
         # Check if WiFi interface exists - try multiple methods
         wifi_interface = None
         
@@ -2940,10 +3574,6 @@ def wifi_status():
 def wifi_scan():
     """Scan for available WiFi networks."""
     try:
-        import subprocess
-        import re
-        import os
-        
         # Check if WiFi interface exists - try multiple methods
         wifi_interface = None
         
@@ -2974,8 +3604,7 @@ def wifi_scan():
         
         # Use iwlist to scan for networks
         # If running as root (UID 0), use iwlist directly; otherwise use sudo
-        import os as os_module
-        if os_module.getuid() == 0:
+        if os.getuid() == 0:
             # Running as root, no sudo needed
             result = subprocess.run(['/usr/sbin/iwlist', wifi_interface, 'scan'], 
                                   capture_output=True, text=True, timeout=10)
@@ -3066,8 +3695,6 @@ def wifi_scan():
 def wifi_connect():
     """Connect to a WiFi network."""
     try:
-        import subprocess
-        import os as os_module
         data = request.get_json()
         ssid = data.get('ssid')
         password = data.get('password', '')
@@ -3094,7 +3721,7 @@ def wifi_connect():
                          capture_output=True, text=True, timeout=5)
             
             # Create new connection with proper security settings
-            if os_module.getuid() == 0:
+            if os.getuid() == 0:
                 cmd = ['/usr/bin/nmcli', 'connection', 'add', 'type', 'wifi', 
                        'con-name', ssid, 'ifname', 'wlan0', 'ssid', ssid,
                        'wifi-sec.key-mgmt', 'wpa-psk', 'wifi-sec.psk', password]
@@ -3111,7 +3738,7 @@ def wifi_connect():
                 }), 500
             
             # Activate the connection
-            if os_module.getuid() == 0:
+            if os.getuid() == 0:
                 activate_cmd = ['/usr/bin/nmcli', 'connection', 'up', ssid]
             else:
                 activate_cmd = ['/usr/bin/sudo', '/usr/bin/nmcli', 'connection', 'up', ssid]
@@ -3129,7 +3756,7 @@ def wifi_connect():
                 }), 500
         else:
             # Open network without password
-            if os_module.getuid() == 0:
+            if os.getuid() == 0:
                 cmd = ['/usr/bin/nmcli', 'dev', 'wifi', 'connect', ssid]
             else:
                 cmd = ['/usr/bin/sudo', '/usr/bin/nmcli', 'dev', 'wifi', 'connect', ssid]
@@ -3152,7 +3779,6 @@ def wifi_connect():
 @app.route('/api/fan/status', methods=['GET'])
 def fan_status():
     """Get current fan status"""
-    import time
     last_hb = fan_state.get('last_heartbeat')
     return jsonify({
         'running': fan_state['running'],
@@ -3470,16 +4096,13 @@ def pid_autotune():
                     
                         # Read current airspeed
                         try:
-                            conn = sqlite3.connect(DB_FILE)
-                            cursor = conn.cursor()
-                            cursor.execute("""
-                                SELECT value FROM sensor_data 
-                                WHERE sensor_id = ? 
-                                ORDER BY timestamp DESC 
-                                LIMIT 1
-                            """, (sensor_id,))
-                            result = cursor.fetchone()
-                            conn.close()
+                            with db_read_connection() as conn:
+                                result = conn.execute("""
+                                    SELECT value FROM sensor_data 
+                                    WHERE sensor_id = (SELECT id FROM sensor_names WHERE name = ?) 
+                                    ORDER BY timestamp DESC 
+                                    LIMIT 1
+                                """, (sensor_id,)).fetchone()
                             
                             if result:
                                 current_airspeed = float(result[0])
@@ -3626,8 +4249,6 @@ def pid_autotune_stop():
 def internet_check():
     """Check internet connectivity."""
     try:
-        import socket
-        
         # Try to connect to Google's DNS server
         socket.setdefaulttimeout(3)
         socket.socket(socket.AF_INET, socket.SOCK_STREAM).connect(("8.8.8.8", 53))
@@ -3643,9 +4264,6 @@ def internet_check():
 def list_usb_drives():
     """List available USB drives."""
     try:
-        import subprocess
-        import re
-        
         drives = []
         
         # Try to detect USB drives using different methods based on platform
@@ -3654,7 +4272,6 @@ def list_usb_drives():
             result = subprocess.run(['lsblk', '-o', 'NAME,SIZE,MOUNTPOINT,TYPE', '-J'], 
                                   capture_output=True, text=True, timeout=5)
             if result.returncode == 0:
-                import json
                 devices = json.loads(result.stdout)
                 
                 for device in devices.get('blockdevices', []):
@@ -3674,7 +4291,6 @@ def list_usb_drives():
         
         # If no drives found, try looking in common mount points
         if not drives:
-            import os
             common_mounts = ['/media', '/mnt']
             for mount_base in common_mounts:
                 if os.path.exists(mount_base):
@@ -3719,12 +4335,11 @@ def export_data():
             return jsonify({'status': 'error', 'message': 'Drive path is required'}), 400
         
         # Create filename with timestamp
-        from datetime import datetime
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         filename = f'windtunnel_data_{timestamp}.csv'
         filepath = os.path.join(drive_path, filename)
         
-        conn = sqlite3.connect(DB_FILE)
+        conn = open_db_connection(read_only=True)
         cursor = conn.cursor()
         
         # Build time filter query
@@ -3746,7 +4361,11 @@ def export_data():
         # else: time_range == 'all', no filter
         
         # Get all unique sensor IDs
-        cursor.execute(f'SELECT DISTINCT sensor_id FROM sensor_data {time_filter_sql} ORDER BY sensor_id', time_filter_params)
+        cursor.execute(f'''
+            SELECT name FROM sensor_names
+            WHERE id IN (SELECT DISTINCT sensor_id FROM sensor_data {time_filter_sql})
+            ORDER BY name
+        ''', time_filter_params)
         sensor_ids = [row[0] for row in cursor.fetchall()]
         
         if not sensor_ids:
@@ -3779,10 +4398,10 @@ def export_data():
                 # Get all data for this chunk of timestamps
                 placeholders = ','.join('?' * len(chunk_timestamps))
                 cursor.execute(f'''
-                    SELECT timestamp, sensor_id, value, sequence_name, step_number
-                    FROM sensor_data 
-                    WHERE timestamp IN ({placeholders})
-                    ORDER BY timestamp, sensor_id
+                    SELECT d.timestamp, n.name, d.value, d.sequence_name, d.step_number
+                    FROM sensor_data d JOIN sensor_names n ON n.id = d.sensor_id
+                    WHERE d.timestamp IN ({placeholders})
+                    ORDER BY d.timestamp, n.name
                 ''', chunk_timestamps)
                 
                 # Build data structure: {timestamp: {sensor_id: value, sequence_name: name, step_number: num}}
@@ -3827,7 +4446,6 @@ def export_data():
         return jsonify({'status': 'error', 'message': 'Permission denied. Drive may be read-only.'}), 500
     except Exception as e:
         print(f"Error exporting data: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
@@ -3836,7 +4454,7 @@ def reset_settings():
     """Reset settings to defaults."""
     global current_settings
     
-    current_settings = DEFAULT_SETTINGS.copy()
+    current_settings = default_settings()
     
     if save_settings_to_file(current_settings):
         # Emit settings update to all connected clients
@@ -3938,7 +4556,6 @@ def test_sensor():
                     pass
             
             print(f"[TEST-SENSOR] Exception during init/read: {init_error}")
-            import traceback
             traceback.print_exc()
             return jsonify({
                 'status': 'error',
@@ -3947,7 +4564,6 @@ def test_sensor():
             
     except Exception as e:
         print(f"[TEST-SENSOR] Exception in test_sensor: {e}")
-        import traceback
         traceback.print_exc()
         return jsonify({
             'status': 'error',
@@ -4010,7 +4626,6 @@ def configure_udp_device():
             return jsonify({'status': 'error', 'error': 'device_ip is required'}), 400
         
         # Get Raspberry Pi's local IP (best effort)
-        import socket
         s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         try:
             s.connect(('8.8.8.8', 80))
@@ -4142,7 +4757,6 @@ def get_sensor_status(sensor_id):
 def get_udp_devices():
     """Get list of all UDP devices currently sending data"""
     try:
-        import time
         current_time = time.time()
         devices = []
         
@@ -4273,7 +4887,6 @@ def setup_device_wizard():
 
 def generate_random_color():
     """Generate a random color for sensor charts"""
-    import random
     colors = [
         '#FF6384', '#36A2EB', '#FFCE56', '#4BC0C0', '#9966FF',
         '#FF9F40', '#FF6384', '#C9CBCF', '#4BC0C0', '#FF9F40'
@@ -4357,7 +4970,6 @@ def capture_tare(sensor_id):
             return jsonify({'error': 'Source sensors not configured'}), 400
         
         # Collect samples
-        import time
         s1_samples = []
         s2_samples = []
         s3_samples = []
@@ -4412,7 +5024,6 @@ def capture_calibration_point(sensor_id):
             return jsonify({'error': 'Source sensors not configured'}), 400
         
         # Collect samples
-        import time
         s1_samples = []
         s2_samples = []
         s3_samples = []
@@ -4434,13 +5045,12 @@ def capture_calibration_point(sensor_id):
         s3_tared = s3_avg - tare_offsets[2]
         
         # Evaluate formula with tared values
-        eval_formula = formula.replace('s1', str(s1_tared)).replace('s2', str(s2_tared)).replace('s3', str(s3_tared))
-        eval_formula = eval_formula.replace('^', '**')
-        
-        if not re.match(r'^[\d\s\.\+\-\*/\(\)\*]+$', eval_formula):
+        try:
+            formula_code = compile_formula(formula, FORCE_BALANCE_NAMES)
+        except ValueError:
             return jsonify({'error': 'Invalid formula'}), 400
-        
-        raw_result = eval(eval_formula)
+
+        raw_result = eval(formula_code, {'__builtins__': {}}, {'s1': s1_tared, 's2': s2_tared, 's3': s3_tared})
         
         # Calculate calibration factor
         calibration_factor = applied_force / raw_result if raw_result != 0 else 1.0
@@ -4532,18 +5142,94 @@ def reset_calibration(sensor_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Environment for read-only git queries - no optional index lock, no locale lookups
+GIT_READ_ENV = dict(os.environ, GIT_OPTIONAL_LOCKS='0', LC_ALL='C')
+
+# Open pygit2 repositories {git dir: Repository}, reused across update checks
+_git_repositories = {}
+
+def open_git_repository(path):
+    """
+    Return the cached pygit2 Repository containing path, or None if there is none.
+    
+    Keyed by the discovered .git directory, so the working tree and any path
+    inside it share one Repository object.
+    """
+    git_dir = pygit2.discover_repository(path)
+    if git_dir is None:
+        return None
+    repo = _git_repositories.get(git_dir)
+    if repo is None:
+        repo = pygit2.Repository(git_dir)
+        _git_repositories[git_dir] = repo
+    return repo
+
+# Update check results {repo_dir: (checked_at, commits_behind)}, so repeated
+# clicks don't fetch from the remote every time
+COMMITS_BEHIND_TTL = 30  # seconds
+commits_behind_cache = {}
+commits_behind_lock = Lock()
+
+def count_commits_behind(repo_dir):
+    """
+    Count commits on origin/main that HEAD doesn't have (run after fetching).
+    
+    Uses pygit2 in-process when installed, otherwise `git rev-list --count`.
+    """
+    repo = open_git_repository(repo_dir) if pygit2 is not None else None
+    if repo is not None:
+        upstream = repo.references['refs/remotes/origin/main'].target
+        ahead, behind = repo.ahead_behind(repo.head.target, upstream)
+        return behind
+    
+    result = subprocess.run(
+        ['git', 'rev-list', '--count', 'HEAD..origin/main'],
+        cwd=repo_dir,
+        capture_output=True,
+        env=GIT_READ_ENV,
+        timeout=5
+    )
+    return int(result.stdout)
+
+def check_commits_behind(repo_dir):
+    """
+    Fetch origin/main and count the commits HEAD is behind, cached for COMMITS_BEHIND_TTL.
+    
+    Returns None if the fetch fails - the local origin/main may be stale, so
+    the count is unknown and nothing is cached. Concurrent checks wait for
+    the one in flight and reuse its result.
+    """
+    with commits_behind_lock:
+        cached = commits_behind_cache.get(repo_dir)
+        if cached is not None and time.monotonic() - cached[0] < COMMITS_BEHIND_TTL:
+            return cached[1]
+        
+        # Fetch latest main from remote (tags aren't needed for the count; a
+        # timeout raises and the caller goes ahead with the update anyway)
+        fetch = subprocess.run(['git', 'fetch', '--no-tags', 'origin', 'main'], 
+                     cwd=repo_dir, 
+                     capture_output=True, 
+                     text=True,
+                     timeout=5)
+        if fetch.returncode != 0:
+            logger.warning(f"git fetch failed: {fetch.stderr.strip()}")
+            return None
+        
+        commits_behind = count_commits_behind(repo_dir)
+        commits_behind_cache[repo_dir] = (time.monotonic(), commits_behind)
+        return commits_behind
+
 @app.route('/api/update', methods=['POST'])
 def trigger_update():
     """Trigger system update via install script."""
-    import subprocess
-    import os
-    import shutil
-    
     global update_in_progress
     
+    # Claim the update before any checks so concurrent requests can't both start install.sh
     with update_lock:
         if update_in_progress:
             return jsonify({'status': 'error', 'message': 'Update already in progress. Please wait.'}), 409
+        update_in_progress = True
+    update_started = False
     
     try:
         # Get the project root directory (where app.py is located)
@@ -4559,23 +5245,8 @@ def trigger_update():
         
         # Check if updates are available
         try:
-            # Fetch latest from remote
-            subprocess.run(['git', 'fetch', 'origin', 'main'], 
-                         cwd=os.path.dirname(script_path), 
-                         capture_output=True, 
-                         text=True,
-                         timeout=10)
-            
-            # Check if local is behind remote
-            result = subprocess.run(
-                ['git', 'rev-list', '--count', 'HEAD..origin/main'],
-                cwd=os.path.dirname(script_path),
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            
-            commits_behind = int(result.stdout.strip())
+            # Check if local is behind remote (None = unknown, update anyway)
+            commits_behind = check_commits_behind(os.path.dirname(script_path))
             
             if commits_behind == 0:
                 return jsonify({
@@ -4586,88 +5257,80 @@ def trigger_update():
             # If git check fails, continue anyway (might be connectivity issue)
             pass
         
-        # Find bash executable
-        bash_path = shutil.which('bash')
-        if not bash_path:
-            # Try common locations
-            for path in ['/bin/bash', '/usr/bin/bash', '/usr/local/bin/bash']:
-                if os.path.exists(path):
-                    bash_path = path
-                    break
-        
-        if not bash_path:
+        if not BASH_PATH:
             return jsonify({'status': 'error', 'message': 'bash executable not found'}), 500
         
-        # Mark update as in progress
-        with update_lock:
-            update_in_progress = True
-        
         # Emit initial status via WebSocket
         socketio.emit('update_progress', {'step': 'Starting update process...', 'type': 'info'})
         
-        # Start a thread to run the update
+        # Run the update as a background task on the Socket.IO server's async backend
         def run_update():
-            global update_in_progress
+            global update_in_progress, version_info
             try:
                 socketio.emit('update_progress', {'step': 'Running install script in auto-update mode...', 'type': 'info'})
-                socketio.sleep(0.1)  # Give time for message to send
                 
                 # Run install.sh with auto-update flag (non-interactive)
-                # Use Popen to capture output in real-time
-                import os
                 env = os.environ.copy()
                 env['PYTHONUNBUFFERED'] = '1'  # Disable Python output buffering
                 
-                # Find shell executable - try common locations
-                shell_cmd = None
-                for shell in ['/bin/bash', '/usr/bin/bash', '/bin/sh', '/usr/bin/sh']:
-                    if os.path.exists(shell):
-                        shell_cmd = shell
-                        break
+                socketio.emit('update_progress', {'step': f'Using shell: {BASH_PATH}', 'type': 'info'})
                 
-                if not shell_cmd:
-                    socketio.emit('update_progress', {'step': 'Error: No shell found (bash/sh)', 'type': 'error'})
-                    return
+                # Output goes straight to the log file (own session, no pipe to keep
+                # drained); progress is sent by tailing the file below
+                log_fd = os.open(UPDATE_LOG_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_NOFOLLOW, 0o644)
+                try:
+                    process = subprocess.Popen(
+                        [BASH_PATH, script_path, 'auto-update'],
+                        stdin=subprocess.DEVNULL,
+                        stdout=log_fd,
+                        stderr=log_fd,
+                        cwd=os.path.dirname(script_path),
+                        env=env,
+                        start_new_session=True
+                    )
+                finally:
+                    os.close(log_fd)
                 
-                socketio.emit('update_progress', {'step': f'Using shell: {shell_cmd}', 'type': 'info'})
+                progress_limiter = TokenBucket(UPDATE_PROGRESS_RATE, UPDATE_PROGRESS_BURST)
+                pending_entries = deque(maxlen=UPDATE_PROGRESS_BACKLOG)
                 
-                # Use found shell
-                process = subprocess.Popen(
-                    [shell_cmd, script_path, 'auto-update'],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    bufsize=0,  # Unbuffered
-                    universal_newlines=True,
-                    cwd=os.path.dirname(script_path),
-                    env=env
-                )
+                def flush_entries(force=False):
+                    """Send held lines as one update_progress event if the rate limit allows"""
+                    if pending_entries and (progress_limiter.try_take() or force):
+                        socketio.emit('update_progress', {'lines': list(pending_entries)})
+                        pending_entries.clear()
                 
-                # Read output line by line in real-time
-                while True:
-                    line = process.stdout.readline()
-                    if not line and process.poll() is not None:
-                        break
-                    
-                    if line:
-                        clean_line = line.strip()
-                        # Skip empty lines, comment lines, and ANSI escape sequences
-                        if clean_line and not clean_line.startswith('#'):
-                            # Remove ANSI color codes
-                            import re
-                            clean_line = re.sub(r'\x1b\[[0-9;]*m', '', clean_line)
-                            
-                            # Determine message type
-                            msg_type = 'info'
-                            if '✓' in clean_line or 'success' in clean_line.lower():
-                                msg_type = 'success'
-                            elif '✗' in clean_line or 'error' in clean_line.lower() or 'fail' in clean_line.lower():
-                                msg_type = 'error'
-                            elif '⚠' in clean_line or 'warning' in clean_line.lower():
-                                msg_type = 'warning'
-                            
-                            socketio.emit('update_progress', {'step': clean_line, 'type': msg_type})
-                            socketio.sleep(0.01)  # Small delay to ensure message is sent
+                def emit_lines(raw_lines):
+                    """Clean a batch of output lines and queue them for update_progress"""
+                    for raw_line in raw_lines:
+                        clean_line = raw_line.decode('utf-8', errors='replace').strip()
+                        # Skip empty lines and comment lines
+                        if not clean_line or clean_line.startswith('#'):
+                            continue
+                        # Remove ANSI color codes
+                        clean_line = ANSI_RE.sub('', clean_line)
+                        
+                        pending_entries.append({'step': clean_line, 'type': classify_update_line(clean_line)})
+                    flush_entries()
+                
+                # Every UPDATE_LOG_POLL_INTERVAL send all complete lines written since
+                # the last poll as one event (held back while rate limited)
+                pending = b''
+                with open(UPDATE_LOG_FILE, 'rb', buffering=0) as log_file:
+                    while True:
+                        finished = process.poll() is not None
+                        chunk = log_file.read()
+                        if chunk:
+                            *complete, pending = (pending + chunk).split(b'\n')
+                            emit_lines(complete)
+                        else:
+                            flush_entries()
+                        if finished:
+                            break  # Output written before exit was read above
+                        socketio.sleep(UPDATE_LOG_POLL_INTERVAL)
+                
+                emit_lines([pending])
+                flush_entries(force=True)
                 
                 # Wait for process to complete
                 process.wait()
@@ -4685,155 +5348,140 @@ def trigger_update():
             finally:
                 with update_lock:
                     update_in_progress = False
+                version_info = read_git_version()
+                commits_behind_cache.clear()
         
-        import threading
-        threading.Thread(target=run_update, daemon=True).start()
+        socketio.start_background_task(run_update)
+        update_started = True
         
         return jsonify({'status': 'success', 'message': 'Update started. Watch progress below.'})
     except Exception as e:
-        with update_lock:
-            update_in_progress = False
         return jsonify({'status': 'error', 'message': str(e)}), 500
+    finally:
+        # run_update clears the flag when it finishes; release it here on every other path
+        if not update_started:
+            with update_lock:
+                update_in_progress = False
+
+@app.route('/api/update/log', methods=['GET'])
+def get_update_log():
+    """Raw install.sh output of the last (or running) update."""
+    if not os.path.exists(UPDATE_LOG_FILE):
+        return jsonify({'status': 'error', 'message': 'No update log available'}), 404
+    return send_file(UPDATE_LOG_FILE, mimetype='text/plain', max_age=0)
+
+def read_git_version_pygit2(project_root):
+    """Read the commit hash and date in-process with pygit2, or None if that isn't possible."""
+    try:
+        repo = open_git_repository(project_root)
+        if repo is None:
+            return None
+        commit = repo[repo.head.target]
+    except (pygit2.GitError, KeyError):
+        return None
+    # Committer date in the committer's timezone, like git log --date=short
+    committed = datetime.fromtimestamp(commit.commit_time, timezone(timedelta(minutes=commit.commit_time_offset)))
+    return {
+        'commit': commit.short_id,
+        'date': committed.strftime('%Y-%m-%d')
+    }
 
-@app.route('/api/version')
-def get_version():
-    """Get current version info from git."""
-    import subprocess
-    import os
+def read_git_version():
+    """
+    Read the current commit hash and date from git.
     
+    Uses pygit2 when installed, otherwise two git subprocesses.
+    """
     try:
         project_root = os.path.dirname(os.path.abspath(__file__))
         
+        if pygit2 is not None:
+            version = read_git_version_pygit2(project_root)
+            if version is not None:
+                return version
+        
         # Get current commit hash
         result = subprocess.run(
             ['git', 'rev-parse', '--short', 'HEAD'],
             cwd=project_root,
             capture_output=True,
-            text=True,
+            env=GIT_READ_ENV,
             timeout=5
         )
         
         if result.returncode != 0:
-            print(f"Git rev-parse failed: {result.stderr}")
-            return jsonify({'commit': 'unknown', 'date': 'unknown', 'error': result.stderr.strip()})
+            stderr = result.stderr.decode('utf-8', 'replace')
+            print(f"Git rev-parse failed: {stderr}")
+            return {'commit': 'unknown', 'date': 'unknown', 'error': stderr.strip()}
         
-        commit_hash = result.stdout.strip()
+        commit_hash = result.stdout.decode('ascii', 'replace').strip()
         
         # Get commit date
         result = subprocess.run(
             ['git', 'log', '-1', '--format=%cd', '--date=short'],
             cwd=project_root,
             capture_output=True,
-            text=True,
+            env=GIT_READ_ENV,
             timeout=5
         )
         
         if result.returncode != 0:
-            print(f"Git log failed: {result.stderr}")
+            print(f"Git log failed: {result.stderr.decode('utf-8', 'replace')}")
             commit_date = 'unknown'
         else:
-            commit_date = result.stdout.strip()
+            commit_date = result.stdout.decode('ascii', 'replace').strip()
         
-        return jsonify({
+        return {
             'commit': commit_hash,
             'date': commit_date
-        })
+        }
     except subprocess.TimeoutExpired as e:
         print(f"Git command timeout: {e}")
-        return jsonify({'commit': 'timeout', 'date': 'timeout', 'error': 'Git command timed out'})
+        return {'commit': 'timeout', 'date': 'timeout', 'error': 'Git command timed out'}
     except FileNotFoundError as e:
         print(f"Git not found: {e}")
-        return jsonify({'commit': 'no-git', 'date': 'no-git', 'error': 'Git not installed'})
+        return {'commit': 'no-git', 'date': 'no-git', 'error': 'Git not installed'}
     except Exception as e:
         print(f"Version check error: {e}")
-        return jsonify({'commit': 'error', 'date': 'error', 'error': str(e)})
+        return {'commit': 'error', 'date': 'error', 'error': str(e)}
+
+# Version info is read once at startup and refreshed after an update
+version_info = read_git_version()
+
+@app.route('/api/version')
+def get_version():
+    """Get current version info from git (cached)."""
+    global version_info
+    
+    # Retry failed lookups (e.g. git timed out at boot) instead of caching the error
+    if 'error' in version_info:
+        version_info = read_git_version()
+    
+    return jsonify(version_info)
 
 @app.route('/api/data')
 def get_data():
-    """REST API endpoint to get current wind tunnel data."""
-    return jsonify(generate_mock_data())
-
-# CSV LOG FILE ENDPOINTS - DISABLED (using SQLite database instead)
-# @app.route('/api/logs', methods=['GET'])
-# def get_log_files():
-#     """Get list of available log files."""
-#     try:
-#         log_files = []
-#         if os.path.exists(DATA_LOG_DIR):
-#             for filename in os.listdir(DATA_LOG_DIR):
-#                 if filename.endswith('.csv'):
-#                     filepath = os.path.join(DATA_LOG_DIR, filename)
-#                     file_size = os.path.getsize(filepath)
-#                     file_time = os.path.getmtime(filepath)
-#                     
-#                     # Count rows
-#                     try:
-#                         with open(filepath, 'r') as f:
-#                             row_count = sum(1 for _ in f) - 1  # Subtract header
-#                     except:
-#                         row_count = 0
-#                     
-#                     log_files.append({
-#                         'filename': filename,
-#                         'size': file_size,
-#                         'size_mb': round(file_size / 1024 / 1024, 2),
-#                         'modified': datetime.fromtimestamp(file_time).isoformat(),
-#                         'rows': row_count,
-#                         'is_current': filepath == current_log_file
-#                     })
-#         
-#         # Sort by modified time, newest first
-#         log_files.sort(key=lambda x: x['modified'], reverse=True)
-#         
-#         return jsonify({
-#             'status': 'success',
-#             'files': log_files,
-#             'logging_active': current_settings.get('dataLogging', False),
-#             'current_file': os.path.basename(current_log_file) if current_log_file else None
-#         })
-#     except Exception as e:
-#         return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# @app.route('/api/logs/<filename>', methods=['GET'])
-# def download_log_file(filename):
-#     """Download a specific log file."""
-#     from flask import send_file
-#     try:
-#         # Security: ensure filename doesn't contain path traversal
-#         if '..' in filename or '/' in filename or '\\' in filename:
-#             return jsonify({'status': 'error', 'message': 'Invalid filename'}), 400
-#         
-#         filepath = os.path.join(DATA_LOG_DIR, filename)
-#         
-#         if not os.path.exists(filepath):
-#             return jsonify({'status': 'error', 'message': 'File not found'}), 404
-#         
-#         return send_file(filepath, as_attachment=True, download_name=filename)
-#     except Exception as e:
-#         return jsonify({'status': 'error', 'message': str(e)}), 500
-
-# @app.route('/api/logs/<filename>', methods=['DELETE'])
-# def delete_log_file(filename):
-#     """Delete a specific log file."""
-#     try:
-#         # Security: ensure filename doesn't contain path traversal
-#         if '..' in filename or '/' in filename or '\\' in filename:
-#             return jsonify({'status': 'error', 'message': 'Invalid filename'}), 400
-#         
-#         filepath = os.path.join(DATA_LOG_DIR, filename)
-#         
-#         # Don't allow deleting current log file
-#         if filepath == current_log_file:
-#             return jsonify({'status': 'error', 'message': 'Cannot delete active log file'}), 400
-#         
-#         if not os.path.exists(filepath):
-#             return jsonify({'status': 'error', 'message': 'File not found'}), 404
-#         
-#         os.remove(filepath)
-#         return jsonify({'status': 'success', 'message': f'Deleted {filename}'})
-#     except Exception as e:
-#         return jsonify({'status': 'error', 'message': str(e)}), 500
-# END CSV LOG FILE ENDPOINTS
+    """
+    REST API endpoint to get current wind tunnel data (latest background tick).
+    
+    The tick timestamp is the ETag, so pollers that already have the current
+    tick get 304 Not Modified, and browsers may reuse a response for up to a
+    second while revalidating in the background.
+    """
+    global last_tick_body
+    
+    tick = current_tick()
+    cached = last_tick_body
+    if cached is not None and cached[0] is tick:
+        body = cached[1]
+    else:
+        body = orjson.dumps(tick) if orjson is not None else json.dumps(tick).encode('utf-8')
+        last_tick_body = (tick, body)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(repr(tick['timestamp']))
+    # Raw header - ResponseCacheControl only gained stale_while_revalidate in Werkzeug 3.1
+    response.headers['Cache-Control'] = 'max-age=0, stale-while-revalidate=1'
+    return response.make_conditional(request)
 
 # WebSocket events
 @socketio.on('connect')
@@ -4841,32 +5489,38 @@ def handle_connect():
     """Handle client connection."""
     global background_thread
     print('Client connected')
+    join_room(TELEMETRY_ROOM)
     
     # Update heartbeat timestamp
-    import time
     fan_state['last_heartbeat'] = time.time()
     
     with thread_lock:
         if background_thread is None:
             background_thread = socketio.start_background_task(background_data_updater)
+            socketio.start_background_task(ui_batch_emitter)
+            socketio.start_background_task(db_maintenance_scheduler)
     # Don't emit immediately - background thread will send data within 200ms
 
 @socketio.on('disconnect')
 def handle_disconnect():
     """Handle client disconnection."""
     print('Client disconnected')
+    last_requested_tick.pop(request.sid, None)
 
 @socketio.on('heartbeat')
 def handle_heartbeat():
     """Handle client heartbeat for fan safety monitoring"""
-    import time
     fan_state['last_heartbeat'] = time.time()
     return {'status': 'ok', 'timestamp': time.time()}
 
 @socketio.on('request_data')
 def handle_data_request():
-    """Handle explicit data requests from clients."""
-    emit('data_update', generate_mock_data())
+    """Handle explicit data requests from clients (at most one reply per tick)."""
+    tick = current_tick()
+    if last_requested_tick.get(request.sid) is tick:
+        return
+    last_requested_tick[request.sid] = tick
+    emit('data_update', tick)
 
 # Initialize background threads when module is loaded (for Gunicorn)
 _threads_started = False
@@ -4878,16 +5532,15 @@ def init_background_threads():
     if _threads_started:
         return  # Already started in this process
     
-    import threading
+    # Started through Socket.IO so they run on the same async backend as the
+    # server (green threads under eventlet, daemon threads in threading mode)
     
     # Start fan safety monitoring thread
-    safety_thread = threading.Thread(target=check_fan_safety, daemon=True)
-    safety_thread.start()
+    socketio.start_background_task(check_fan_safety)
     print("✓ Fan safety monitoring started")
     
     # Start UDP discovery listener thread
-    discovery_listener_thread = threading.Thread(target=udp_discovery_listener, daemon=True)
-    discovery_listener_thread.start()
+    socketio.start_background_task(udp_discovery_listener)
     print("✓ UDP discovery listener thread started")
     logger.info("UDP discovery listener thread started")
     
@@ -5275,5 +5928,22 @@ if __name__ == '__main__':
     # Run on all interfaces for Raspberry Pi access
     # Use port 80 (standard HTTP port), disable debug in production
     # Note: On Linux/Raspberry Pi, running on port 80 requires sudo/root privileges
-    # Using threaded mode for better WebSocket performance
-    socketio.run(app, host='0.0.0.0', port=80, debug=False, allow_unsafe_werkzeug=True)
+    # Serves with eventlet's WSGI server (or Werkzeug in threading mode).
+    # TLS is not handled here - terminate it in a reverse proxy (see README)
+    if ASYNC_MODE == 'eventlet':
+        # Same server socketio.run() starts, but with Nagle disabled on the
+        # listener (inherited by accepted connections) so small Socket.IO
+        # frames go out as soon as they're emitted
+        import eventlet.wsgi
+        listener = eventlet.listen(('0.0.0.0', 80))
+        listener.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        eventlet.wsgi.server(listener, app, log_output=False)
+    else:
+        # Werkzeug sets TCP_NODELAY on each accepted connection via the handler
+        from werkzeug.serving import WSGIRequestHandler
+        
+        class NoDelayRequestHandler(WSGIRequestHandler):
+            disable_nagle_algorithm = True
+        
+        socketio.run(app, host='0.0.0.0', port=80, debug=False, allow_unsafe_werkzeug=True,
+                     request_handler=NoDelayRequestHandler)
@@ -327,7 +327,19 @@ function stopHeartbeat() {
 // Data update handler
 socket.on('data_update', (data) => {
     console.log('Received data:', data);
-    updateDisplay(data);
+    // Live updates arrive batched, oldest first - either column-keyed as
+    // {count, keys: [...], rows: [[...], ...]} or as {count, items: [...]}
+    if (Array.isArray(data.rows)) {
+        data.rows.forEach(row => {
+            const item = {};
+            data.keys.forEach((key, i) => { item[key] = row[i]; });
+            updateDisplay(item);
+        });
+    } else if (Array.isArray(data.items)) {
+        data.items.forEach(item => updateDisplay(item));
+    } else {
+        updateDisplay(data);
+    }
 });
 
 // Periodic data request (backup in case WebSocket updates fail)
@@ -475,8 +487,10 @@ async function loadHistoricalData(sensorId, startTime = null, endTime = null) {
         const result = await response.json();
         
         if (result.status === 'success') {
-            console.log(`Loaded ${result.data.length} points for ${sensorId} (${((endTime - startTime) / 60).toFixed(1)} minutes)`);
-            return result.data; // [{timestamp, value}, ...]
+            // Server sends [timestamp, value] pairs - convert to the graph cache format
+            const data = result.points.map(([timestamp, value]) => ({ timestamp: timestamp, value: value }));
+            console.log(`Loaded ${data.length} points for ${sensorId} (${((endTime - startTime) / 60).toFixed(1)} minutes)`);
+            return data; // [{timestamp, value}, ...]
         }
     } catch (error) {
         console.error('Failed to load historical data:', error);